@@ -0,0 +1,242 @@
+"""Employer job analytics: per-job funnel counters and daily rollups.
+
+``JobStats`` (one row per job) and ``JobDailyStat`` (one row per job and
+UTC day) are adjusted with ``F()`` updates as events happen:
+
+* views: :func:`record_view` from the job page;
+* saves: ``SavedJob`` post_save, and :func:`record_unsave` from the view
+  that removes one;
+* applications: ``JobApplication`` post_save, for new rows and for status
+  changes. The first move out of Pending stamps
+  ``JobApplication.first_response_at`` and adds the wait to the job's
+  response-time totals.
+
+Deletes are deliberately not tracked (a post_delete receiver would stop
+Django from fast-deleting applications when a job goes), and
+``QuerySet.update()`` bypasses signals. ``python manage.py rebuild_job_stats``
+recounts everything but views from the source tables.
+
+Reads (:func:`employer_summary`) only touch the two stats tables.
+"""
+import datetime
+
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
+
+STATUS_FIELDS = {
+    "Pending": "pending_count",
+    "Reviewed": "reviewed_count",
+    "Interview": "interview_count",
+    "Accepted": "accepted_count",
+    "Rejected": "rejected_count",
+}
+DAILY_FIELDS = ("views", "saves", "applications")
+
+
+def _utc_date(moment):
+    return moment.astimezone(datetime.timezone.utc).date()
+
+
+def _upsert(model, lookup, deltas, assign=None):
+    """Add ``deltas`` (never below zero) to the row matching ``lookup``, creating it if needed."""
+    changes = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+    changes.update(assign or {})
+    with transaction.atomic():
+        if model.objects.filter(**lookup).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup)
+        except IntegrityError:
+            pass  # created concurrently
+        model.objects.filter(**lookup).update(**changes)
+
+
+def _bump(job_id, deltas, assign=None, at=None):
+    from .models import JobDailyStat, JobStats
+
+    with transaction.atomic():
+        _upsert(JobStats, {"job_id": job_id}, deltas, assign)
+        daily = {field: delta for field, delta in deltas.items() if field in DAILY_FIELDS}
+        if daily:
+            _upsert(JobDailyStat, {"job_id": job_id, "date": _utc_date(at or timezone.now())}, daily)
+
+
+def record_view(job_id):
+    _bump(job_id, {"views": 1})
+
+
+def record_save(job_id):
+    _bump(job_id, {"saves": 1})
+
+
+def record_unsave(job_id):
+    _bump(job_id, {"saves": -1})
+
+
+def application_created(application):
+    deltas = {"applications": 1}
+    status_field = STATUS_FIELDS.get(application.status)
+    if status_field:
+        deltas[status_field] = 1
+    applied_at = application.applied_at
+    _bump(
+        application.job_id, deltas,
+        assign={"last_application_at": Coalesce(Greatest(F("last_application_at"), Value(applied_at)), Value(applied_at))},
+        at=applied_at,
+    )
+
+
+def status_changed(application, old_status):
+    from .models import JobApplication
+
+    deltas = {}
+    if STATUS_FIELDS.get(old_status):
+        deltas[STATUS_FIELDS[old_status]] = -1
+    if STATUS_FIELDS.get(application.status):
+        deltas[STATUS_FIELDS[application.status]] = deltas.get(STATUS_FIELDS[application.status], 0) + 1
+
+    if old_status == "Pending" and application.status != "Pending":
+        now = timezone.now()
+        # Conditional update: only the first response per application is counted
+        first = JobApplication.objects.filter(pk=application.pk, first_response_at__isnull=True).update(
+            first_response_at=now
+        )
+        if first:
+            application.first_response_at = now
+            deltas["responded_count"] = 1
+            deltas["response_seconds_total"] = max(int((now - application.applied_at).total_seconds()), 0)
+    if deltas:
+        _bump(application.job_id, deltas)
+
+
+# ---- reads --------------------------------------------------------------
+
+def employer_summary(user, days=30):
+    """Per-job stats, totals and a daily series for ``user``'s jobs, JSON-ready."""
+    from .models import Job, JobDailyStat, JobStats
+
+    jobs = []
+    for job in Job.objects.filter(user=user).select_related("stats").order_by("-created_at"):
+        stats = getattr(job, "stats", None) or JobStats(job=job)
+        avg = stats.avg_response_seconds
+        jobs.append({
+            "id": job.id,
+            "title": job.title,
+            "status": job.status,
+            "views": stats.views,
+            "saves": stats.saves,
+            "applications": stats.applications,
+            "by_status": {status: getattr(stats, field) for status, field in STATUS_FIELDS.items()},
+            "conversion": round(stats.applications / stats.views * 100, 1) if stats.views else None,
+            "avg_response_hours": round(avg / 3600, 1) if avg is not None else None,
+            "last_application_at": stats.last_application_at.isoformat() if stats.last_application_at else None,
+        })
+
+    sums = JobStats.objects.filter(job__user=user).aggregate(
+        views=Coalesce(Sum("views"), 0),
+        saves=Coalesce(Sum("saves"), 0),
+        applications=Coalesce(Sum("applications"), 0),
+        interviews=Coalesce(Sum("interview_count"), 0),
+        accepted=Coalesce(Sum("accepted_count"), 0),
+        responded=Coalesce(Sum("responded_count"), 0),
+        response_seconds=Coalesce(Sum("response_seconds_total"), 0),
+    )
+    responded = sums.pop("responded")
+    response_seconds = sums.pop("response_seconds")
+    sums["avg_response_hours"] = round(response_seconds / responded / 3600, 1) if responded else None
+
+    today = _utc_date(timezone.now())
+    start = today - datetime.timedelta(days=days - 1)
+    stored = {
+        row["date"]: row
+        for row in JobDailyStat.objects.filter(job__user=user, date__gte=start, date__lte=today)
+        .values("date").annotate(views=Sum("views"), saves=Sum("saves"), applications=Sum("applications"))
+    }
+    daily = []
+    for offset in range(days):
+        day = start + datetime.timedelta(days=offset)
+        row = stored.get(day, {})
+        daily.append({"date": day.isoformat(), **{field: row.get(field, 0) for field in DAILY_FIELDS}})
+
+    return {"jobs": jobs, "totals": sums, "daily": daily, "days": days}
+
+
+def job_counts(user):
+    """Total applications and interviews across ``user``'s jobs (employer dashboard)."""
+    from .models import JobStats
+
+    return JobStats.objects.filter(job__user=user).aggregate(
+        applications=Coalesce(Sum("applications"), 0),
+        interviews=Coalesce(Sum("interview_count"), 0),
+    )
+
+
+# ---- rebuild ------------------------------------------------------------
+
+def rebuild(apps=global_apps):
+    """Recount JobStats and JobDailyStat from applications and saves; views are kept.
+
+    ``apps`` lets the data migration pass its historical app registry.
+    """
+    Job = apps.get_model("main", "Job")
+    JobApplication = apps.get_model("main", "JobApplication")
+    SavedJob = apps.get_model("main", "SavedJob")
+    JobStats = apps.get_model("main", "JobStats")
+    JobDailyStat = apps.get_model("main", "JobDailyStat")
+
+    response_time = ExpressionWrapper(F("first_response_at") - F("applied_at"), output_field=DurationField())
+    per_job = {
+        row.pop("job_id"): row
+        for row in JobApplication.objects.values("job_id").annotate(
+            applications=Count("pk"),
+            last_application_at=Max("applied_at"),
+            responded_count=Count("pk", filter=Q(first_response_at__isnull=False)),
+            response_total=Sum(response_time, filter=Q(first_response_at__isnull=False)),
+            **{field: Count("pk", filter=Q(status=status)) for status, field in STATUS_FIELDS.items()},
+        )
+    }
+    saves = dict(SavedJob.objects.values("job_id").annotate(n=Count("pk")).values_list("job_id", "n"))
+
+    utc_day = TruncDate("applied_at", tzinfo=datetime.timezone.utc)
+    daily = {}
+    for job_id, day, n in JobApplication.objects.annotate(day=utc_day).values("job_id", "day").annotate(
+        n=Count("pk")
+    ).values_list("job_id", "day", "n"):
+        daily.setdefault((job_id, day), {})["applications"] = n
+    for job_id, day, n in SavedJob.objects.annotate(
+        day=TruncDate("saved_at", tzinfo=datetime.timezone.utc)
+    ).values("job_id", "day").annotate(n=Count("pk")).values_list("job_id", "day", "n"):
+        daily.setdefault((job_id, day), {})["saves"] = n
+
+    with transaction.atomic():
+        views = dict(JobStats.objects.values_list("job_id", "views"))
+        daily_views = {
+            (job_id, day): n
+            for job_id, day, n in JobDailyStat.objects.filter(views__gt=0).values_list("job_id", "date", "views")
+        }
+        for key, n in daily_views.items():
+            daily.setdefault(key, {})["views"] = n
+
+        JobStats.objects.all().delete()
+        JobDailyStat.objects.all().delete()
+
+        rows = []
+        for job_id in Job.objects.values_list("pk", flat=True).iterator():
+            counts = per_job.get(job_id, {})
+            total = counts.pop("response_total", None)
+            rows.append(JobStats(
+                job_id=job_id,
+                views=views.get(job_id, 0),
+                saves=saves.get(job_id, 0),
+                response_seconds_total=int(total.total_seconds()) if total else 0,
+                **counts,
+            ))
+        JobStats.objects.bulk_create(rows, batch_size=1000)
+        JobDailyStat.objects.bulk_create([
+            JobDailyStat(job_id=job_id, date=day, **counts) for (job_id, day), counts in daily.items()
+        ], batch_size=1000)
+    return len(rows), len(daily)
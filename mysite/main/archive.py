@@ -0,0 +1,91 @@
+"""Move cold rows out of the hot ``Message`` table.
+
+Two kinds of rows are archived into ``ArchivedMessage``:
+
+* soft-deleted messages whose ``deleted_at`` is older than
+  ``MESSAGE_DELETED_RETENTION_DAYS`` (their text is already gone), and
+* read, live messages older than ``MESSAGE_RETENTION_DAYS`` when that
+  setting is not ``None``. Unread messages always stay hot so the unread
+  counters in main/unread.py do not change.
+
+Rows move in id-ordered batches; each batch copies and deletes inside one
+transaction, so an interrupted run can simply be restarted. Deleting from
+``main_message`` also removes the rows from the FTS index via its triggers.
+"""
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import contacts
+
+
+def retention_filter(now=None, retention_days=None, deleted_retention_days=None):
+    """Return the ``Q`` selecting messages due for archiving."""
+    now = now or timezone.now()
+    if retention_days is None:
+        retention_days = getattr(settings, "MESSAGE_RETENTION_DAYS", None)
+    if deleted_retention_days is None:
+        deleted_retention_days = getattr(settings, "MESSAGE_DELETED_RETENTION_DAYS", 30)
+
+    due = Q(is_deleted=True, deleted_at__lt=now - timedelta(days=deleted_retention_days))
+    if retention_days is not None:
+        due |= Q(is_deleted=False, is_read=True, sent_at__lt=now - timedelta(days=retention_days))
+    return due
+
+
+def _to_archive(message):
+    from .models import ArchivedMessage
+
+    return ArchivedMessage(
+        id=message.id,
+        sender_id=message.sender_id,
+        receiver_id=message.receiver_id,
+        conversation_key=message.conversation_key or message.conversation_key_for(message.sender_id, message.receiver_id),
+        sent_at=message.sent_at,
+        content_compressed=b"" if message.is_deleted else zlib.compress(message.content.encode()),
+        is_edited=message.is_edited,
+        is_deleted=message.is_deleted,
+    )
+
+
+def archive_messages(due, batch_size=None, dry_run=False):
+    """Archive every message matching ``due``; yield the size of each batch moved."""
+    from .models import ArchivedMessage, Message
+
+    batch_size = batch_size or getattr(settings, "MESSAGE_ARCHIVE_BATCH_SIZE", 1000)
+    last_id = 0
+    while True:
+        batch = list(
+            Message.objects.filter(due, id__gt=last_id)
+            .order_by("id")
+            .only("id", "sender_id", "receiver_id", "conversation_key", "sent_at", "content", "is_edited", "is_deleted")
+            [:batch_size]
+        )
+        if not batch:
+            return
+        last_id = batch[-1].id
+        if not dry_run:
+            ids = [message.id for message in batch]
+            with transaction.atomic():
+                ArchivedMessage.objects.bulk_create([_to_archive(m) for m in batch], ignore_conflicts=True)
+                Message.objects.filter(id__in=ids).delete()
+            contacts.invalidate(*{m.sender_id for m in batch} | {m.receiver_id for m in batch})
+        yield len(batch)
+
+
+def compact():
+    """Reclaim space after a large archive run (SQLite only)."""
+    if connection.vendor != "sqlite":
+        return False
+    from .search import FTS_TABLE, fts_available
+
+    with connection.cursor() as cursor:
+        if fts_available():
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute("VACUUM")
+        cursor.execute("PRAGMA optimize")
+    return True
@@ -0,0 +1,101 @@
+"""Deferred channel-layer broadcasts.
+
+Signal handlers call :func:`group_send` instead of talking to the channel
+layer directly. The message is only queued once the surrounding database
+transaction commits (so rolled-back rows are never announced) and, inside
+a request, is held until the response is ready and then sent together with
+every other broadcast the request produced.
+"""
+import asyncio
+import logging
+from contextvars import ContextVar
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_pending = ContextVar("broadcast_pending", default=None)
+# The event loop only keeps weak references to tasks; hold background sends
+# here until they finish so they are not garbage-collected mid-flight.
+_background_tasks = set()
+
+
+def group_send(group, message, using=None):
+    """Send ``message`` to ``group`` after the current transaction commits."""
+    transaction.on_commit(lambda: _enqueue(group, message), using=using)
+
+
+def _enqueue(group, message):
+    pending = _pending.get()
+    if pending is None:
+        # Not inside a request (management command, shell, timer thread).
+        flush([(group, message)])
+    else:
+        pending.append((group, message))
+
+
+async def asend_all(messages):
+    """Send every queued ``(group, message)`` pair concurrently."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not messages:
+        return
+    results = await asyncio.gather(
+        *(channel_layer.group_send(group, message) for group, message in messages),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Channel layer broadcast failed: %r", result)
+
+
+def flush(messages):
+    """Synchronously send a batch of broadcasts in a single event-loop hop."""
+    if not messages:
+        return
+    try:
+        async_to_sync(asend_all)(messages)
+    except Exception:
+        logger.exception("Channel layer broadcast failed")
+
+
+class BroadcastBufferMiddleware:
+    """Collect broadcasts made while handling a request and send them in one batch.
+
+    Under ASGI the batch is handed to the event loop as a background task so
+    the response is not held up by channel-layer I/O.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _pending.set([])
+        try:
+            response = self.get_response(request)
+        finally:
+            messages = _pending.get()
+            _pending.reset(token)
+        flush(messages)
+        return response
+
+    async def __acall__(self, request):
+        token = _pending.set([])
+        try:
+            response = await self.get_response(request)
+        finally:
+            messages = _pending.get()
+            _pending.reset(token)
+        if messages:
+            task = asyncio.ensure_future(asend_all(messages))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+        return response
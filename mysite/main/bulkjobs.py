@@ -0,0 +1,52 @@
+"""Set-based bulk actions for an employer's job postings (``manage_jobs``).
+
+Each action costs a fixed number of queries however many jobs are selected:
+duplicates are inserted with one ``bulk_create`` and their skills with one
+more on the ``Job.skills`` through table; deletes are a single queryset
+``delete()``, whose cascade to applications and saved jobs runs as one
+DELETE per related table (there are no delete signals on these models).
+"""
+from django.db import transaction
+
+from . import ics
+
+COPY_FIELDS = ("company_name", "description", "location", "employment_type", "working_schedule")
+
+
+def duplicate_jobs(queryset, owner, batch_size=500):
+    """Copy the selected jobs as drafts owned by ``owner``, skills included.
+
+    Returns the number of jobs created.
+    """
+    from .models import Job
+
+    originals = list(queryset.order_by("pk").only("pk", "title", *COPY_FIELDS))
+    if not originals:
+        return 0
+    through = Job.skills.through
+
+    with transaction.atomic():
+        copies = Job.objects.bulk_create([
+            Job(
+                user=owner,
+                title=f"{job.title} (Copy)"[:Job._meta.get_field("title").max_length],
+                status="draft",
+                **{field: getattr(job, field) for field in COPY_FIELDS},
+            )
+            for job in originals
+        ], batch_size=batch_size)
+        copy_of = {job.pk: copy.pk for job, copy in zip(originals, copies)}
+        links = through.objects.filter(job_id__in=copy_of).values_list("job_id", "skilltag_id")
+        through.objects.bulk_create([
+            through(job_id=copy_of[job_id], skilltag_id=skilltag_id) for job_id, skilltag_id in links
+        ], batch_size=batch_size)
+    return len(copies)
+
+
+def delete_jobs(queryset):
+    """Delete the selected jobs; return ``(jobs, applications)`` deleted."""
+    from .models import Job, JobApplication
+
+    ics.invalidate_job_feeds(queryset.values("pk"))
+    _, per_model = queryset.delete()
+    return per_model.get(Job._meta.label, 0), per_model.get(JobApplication._meta.label, 0)
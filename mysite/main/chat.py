@@ -0,0 +1,79 @@
+"""Helpers shared by the chat WebSocket consumer and the message views."""
+from . import broadcast
+from .pagination import keyset_filter, take_page
+
+MAX_MESSAGE_LENGTH = 1000
+HISTORY_PAGE_SIZE = 30
+
+
+def chat_group_name(user_id):
+    """Channel-layer group every chat socket of ``user_id`` joins."""
+    return f"user_{user_id}_chat"
+
+
+def chat_presence_key(user_id):
+    """Presence key for open chat sockets (distinct from the notification socket)."""
+    return f"chat:{user_id}"
+
+
+def serialize_message(message):
+    return {
+        "id": message.id,
+        "sender_id": message.sender_id,
+        "receiver_id": message.receiver_id,
+        "content": message.content,
+        "sent_at": message.sent_at.isoformat() if message.sent_at else None,
+        "is_read": message.is_read,
+        "is_edited": message.is_edited,
+        "edited_at": message.edited_at.isoformat() if message.edited_at else None,
+        "is_deleted": message.is_deleted,
+    }
+
+
+def chat_event(event, **data):
+    """Build a channel-layer event handled by ``ChatConsumer.chat_event``."""
+    return {"type": "chat_event", "event": event, **data}
+
+
+def push_message_event(message, event):
+    """Push ``event`` ("message", "edited", "deleted") for ``message`` to both participants.
+
+    Used from sync views; the push goes out after the transaction commits.
+    """
+    payload = chat_event(event, message=serialize_message(message))
+    for user_id in {message.sender_id, message.receiver_id}:
+        broadcast.group_send(chat_group_name(user_id), payload)
+
+
+def push_read_receipt(reader_id, sender_id, up_to_id=None):
+    """Tell ``sender_id`` that ``reader_id`` has read their messages."""
+    broadcast.group_send(
+        chat_group_name(sender_id),
+        chat_event("read", reader_id=reader_id, up_to_id=up_to_id),
+    )
+
+
+def conversation_history(user_id, other_id, before_id=None, limit=HISTORY_PAGE_SIZE):
+    """Return ``(messages, has_more)`` for the thread between two users.
+
+    ``messages`` are the ``limit`` newest non-deleted messages older than
+    ``before_id`` (or the newest overall), oldest first. The lookup walks the
+    ``(conversation_key, sent_at, id)`` index, so deep pages cost the same as
+    the first one.
+    """
+    from .models import Message
+
+    thread = Message.objects.filter(conversation_key=Message.conversation_key_for(user_id, other_id))
+    queryset = thread.filter(is_deleted=False)
+    if before_id:
+        cursor = thread.filter(id=before_id).values_list("sent_at", flat=True).first()
+        if cursor is None:
+            return [], False
+        queryset = keyset_filter(queryset, "sent_at", cursor, before_id)
+
+    rows, has_more = take_page(
+        queryset.select_related("sender", "receiver").order_by("-sent_at", "-id"),
+        limit,
+    )
+    rows.reverse()
+    return rows, has_more
@@ -1,7 +1,12 @@
 # main/consumers.py
 import json
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
+from django.utils import timezone
+
+from . import presence, unread
+from .audit import add_audit_log
+from .chat import MAX_MESSAGE_LENGTH, chat_event, chat_group_name, chat_presence_key, serialize_message
 
 class PopularJobsConsumer(AsyncWebsocketConsumer):
     async def connect(self):
@@ -26,7 +31,9 @@ class PopularJobsConsumer(AsyncWebsocketConsumer):
     async def jobs_update(self, event):
         await self.send(text_data=json.dumps({
             "type": "jobs.update",
-            "jobs": event["jobs"]
+            "jobs": event["jobs"],
+            "added": event.get("added", []),
+            "removed": event.get("removed", []),
         }))
 
 
@@ -54,11 +61,14 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             )
             
             await self.accept()
+            await sync_to_async(presence.mark_online, thread_sensitive=False)(self.user.id, self.channel_name)
         else:
             await self.close()
     
     async def disconnect(self, close_code):
         if self.user.is_authenticated:
+            await sync_to_async(presence.mark_offline, thread_sensitive=False)(self.user.id, self.channel_name)
+
             # Leave user-specific group
             await self.channel_layer.group_discard(
                 self.user_group_name,
@@ -73,12 +83,32 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     
     # Receive message from WebSocket (client)
     async def receive(self, text_data):
-        data = json.loads(text_data)
-        
-        if data.get("action") == "mark_read":
-            notification_id = data.get("notification_id")
-            await self.mark_notification_read(notification_id)
+        try:
+            data = json.loads(text_data)
+        except ValueError:
+            return await self.send_error("Invalid JSON")
+        if not isinstance(data, dict):
+            return await self.send_error("Invalid frame")
+
+        if data.get("action") == "heartbeat":
+            await sync_to_async(presence.heartbeat, thread_sensitive=False)(self.user.id, self.channel_name)
+            await self.send(text_data=json.dumps({"type": "heartbeat_ack"}))
+        elif data.get("action") == "mark_read":
+            ids = data.get("notification_ids")
+            if ids is None:
+                ids = [data.get("notification_id")]
+            elif not isinstance(ids, list):
+                return await self.send_error("notification_ids must be a list")
+            updated, unread_count = await self.mark_notifications_read(ids)
+            await self.send(text_data=json.dumps({
+                "type": "mark_read_ack",
+                "updated": updated,
+                "unread_count": unread_count,
+            }))
     
+    async def send_error(self, error):
+        await self.send(text_data=json.dumps({"type": "error", "error": error}))
+
     # Handler for notification events
     async def notification_message(self, event):
         """Send notification to WebSocket"""
@@ -89,20 +119,199 @@ class NotificationConsumer(AsyncWebsocketConsumer):
     
     # Handler for global notification events
     async def global_notification_message(self, event):
-        """Send global notification to WebSocket"""
+        """Send global notification to WebSocket.
+
+        Broadcasts carry the frame already encoded in ``text`` so it is
+        serialized once per announcement rather than once per socket.
+        """
+        if "text" in event:
+            await self.send(text_data=event["text"])
+            return
         await self.send(text_data=json.dumps({
             "type": "global_notification",
             "notification": event["notification"]
         }))
     
-    @database_sync_to_async
-    def mark_notification_read(self, notification_id):
-        """Mark notification as read in database"""
+    async def mark_notifications_read(self, notification_ids):
+        """Mark a batch of notifications read with one UPDATE.
+
+        Returns ``(updated, unread_count)``. Uses the async ORM so bursts
+        of clicks don't queue up on the sync thread pool.
+        """
         from .models import Notification
+        ids = []
+        for value in notification_ids or []:
+            try:
+                ids.append(int(value))
+            except (TypeError, ValueError):
+                continue
+
+        updated = 0
+        if ids:
+            updated = await Notification.objects.filter(
+                user=self.user, id__in=ids, is_read=False
+            ).aupdate(is_read=True)
+        unread_count = await Notification.objects.filter(user=self.user, is_read=False).acount()
+        return updated, unread_count
+
+
+class ChatConsumer(AsyncWebsocketConsumer):
+    """WebSocket consumer for one-to-one messaging.
+
+    A socket joins its user's chat group; sending, read receipts, edits and
+    deletes arrive as ``action`` frames and are fanned out to both
+    participants as ``chat_event`` messages.
+    """
+
+    async def connect(self):
+        self.user = self.scope["user"]
+
+        if self.user.is_authenticated:
+            self.group_name = chat_group_name(self.user.id)
+            await self.channel_layer.group_add(
+                self.group_name,
+                self.channel_name
+            )
+            await self.accept()
+            await sync_to_async(presence.mark_online, thread_sensitive=False)(chat_presence_key(self.user.id), self.channel_name)
+        else:
+            await self.close()
+
+    async def disconnect(self, close_code):
+        if self.user.is_authenticated:
+            await sync_to_async(presence.mark_offline, thread_sensitive=False)(chat_presence_key(self.user.id), self.channel_name)
+            await self.channel_layer.group_discard(
+                self.group_name,
+                self.channel_name
+            )
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+        except ValueError:
+            return await self.send_error("Invalid JSON")
+        if not isinstance(data, dict):
+            return await self.send_error("Invalid frame")
+
+        handlers = {
+            "heartbeat": self.heartbeat,
+            "send": self.send_message,
+            "read": self.mark_read,
+            "edit": self.edit_message,
+            "delete": self.delete_message,
+        }
+        handler = handlers.get(data.get("action"))
+        if handler is None:
+            return await self.send_error("Unknown action")
+        await handler(data)
+
+    # ---- actions ----------------------------------------------------------
+    async def heartbeat(self, data):
+        await sync_to_async(presence.heartbeat, thread_sensitive=False)(chat_presence_key(self.user.id), self.channel_name)
+
+    async def send_message(self, data):
+        from .models import Message, Notification, User
+
+        content = data.get("content")
+        content = content.strip() if isinstance(content, str) else ""
+        if not content:
+            return await self.send_error("Message is empty")
+        if len(content) > MAX_MESSAGE_LENGTH:
+            return await self.send_error(f"Message is longer than {MAX_MESSAGE_LENGTH} characters")
+
+        try:
+            receiver_id = int(data.get("receiver_id"))
+        except (TypeError, ValueError):
+            return await self.send_error("Unknown recipient")
+
+        receiver = await User.objects.select_related("profile").filter(id=receiver_id).afirst()
+        if receiver is None or receiver.id == self.user.id:
+            return await self.send_error("Unknown recipient")
+
+        message = await Message.objects.acreate(sender=self.user, receiver=receiver, content=content)
+        await sync_to_async(add_audit_log)(self.scope, self.user, f"Sent message to {receiver.username}: {content[:120]}")
+        payload = serialize_message(message)
+        await self.fan_out("message", {receiver.id, self.user.id}, message=payload, client_id=data.get("client_id"))
+
+        # Only fall back to a notification when the receiver has no open chat
+        chatting = await sync_to_async(presence.is_online, thread_sensitive=False)(chat_presence_key(receiver.id))
+        if not chatting:
+            profile = await sync_to_async(lambda: self.user.profile)()
+            await Notification.objects.acreate(
+                user=receiver,
+                notification_type='message',
+                title='New Message',
+                message=f'{profile.full_name or self.user.username} sent you a message',
+                link=f'/messages/{self.user.id}/',
+                related_user=self.user
+            )
+
+    async def mark_read(self, data):
+        from .models import Message
+
+        try:
+            other_id = int(data.get("user_id"))
+        except (TypeError, ValueError):
+            return await self.send_error("Invalid user")
+
+        pending = Message.objects.filter(sender_id=other_id, receiver=self.user, is_read=False)
+        last = await pending.order_by("-id").values_list("id", flat=True).afirst()
+        if last is None:
+            return
+        await sync_to_async(unread.mark_conversation_read)(self.user.id, other_id, up_to_id=last)
+        await self.fan_out("read", {other_id}, reader_id=self.user.id, up_to_id=last)
+
+    async def edit_message(self, data):
+        from .models import Message
+
+        content = data.get("content")
+        content = content.strip() if isinstance(content, str) else ""
+        if not content or len(content) > MAX_MESSAGE_LENGTH:
+            return await self.send_error("Invalid content")
+
+        try:
+            message_id = int(data.get("message_id"))
+        except (TypeError, ValueError):
+            return await self.send_error("Message not found")
+
+        message = await Message.objects.filter(id=message_id, sender=self.user, is_deleted=False).afirst()
+        if message is None:
+            return await self.send_error("Message not found")
+        message.content = content
+        message.is_edited = True
+        message.edited_at = timezone.now()
+        await message.asave(update_fields=["content", "is_edited", "edited_at"])
+        await self.fan_out("edited", {message.sender_id, message.receiver_id}, message=serialize_message(message))
+
+    async def delete_message(self, data):
+        from .models import Message
+
         try:
-            notification = Notification.objects.get(id=notification_id, user=self.user)
-            notification.is_read = True
-            notification.save()
-            return True
-        except Notification.DoesNotExist:
-            return False
+            message_id = int(data.get("message_id"))
+        except (TypeError, ValueError):
+            return await self.send_error("Message not found")
+
+        message = await Message.objects.filter(id=message_id, sender=self.user, is_deleted=False).afirst()
+        if message is None:
+            return await self.send_error("Message not found")
+        message.is_deleted = True
+        message.deleted_at = timezone.now()
+        message.content = "[Message deleted]"
+        await message.asave(update_fields=["is_deleted", "deleted_at", "content"])
+        await sync_to_async(unread.message_removed)(message)
+        await self.fan_out("deleted", {message.sender_id, message.receiver_id}, message=serialize_message(message))
+
+    # ---- plumbing -----------------------------------------------------------
+    async def fan_out(self, event, user_ids, **data):
+        payload = chat_event(event, **data)
+        for user_id in user_ids:
+            await self.channel_layer.group_send(chat_group_name(user_id), payload)
+
+    async def send_error(self, error):
+        await self.send(text_data=json.dumps({"type": "error", "error": error}))
+
+    # Handler for chat events from either participant
+    async def chat_event(self, event):
+        data = {key: value for key, value in event.items() if key != "type"}
+        data["type"] = data.pop("event")
+        await self.send(text_data=json.dumps(data))
@@ -0,0 +1,174 @@
+"""Contact list shown in the messaging sidebars.
+
+``messages_inbox``, ``conversation_view`` and the employer inbox all render
+the same thing: the people a user has talked to (newest conversation
+first) followed by people they are connected to through a job application
+but have not messaged yet. :func:`sidebar_contacts` pages that list in
+SQL (grouped by counterpart, ordered and sliced in the database), loads
+profiles and last messages for that page only and caches each page.
+
+Cached pages are keyed by a per-user version that :func:`invalidate`
+replaces. ``post_save`` handlers for messages and applications call it for
+both sides; code that marks messages read with ``update()`` or hard-deletes
+rows in bulk must call it explicitly. No ``post_delete`` handlers are
+connected so queryset deletes stay fast; pages also expire after
+``MESSAGE_CONTACTS_CACHE_SECONDS``.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
+
+CONTACTS_PAGE_SIZE = getattr(settings, "MESSAGE_CONTACTS_PAGE_SIZE", 50)
+CONTACTS_CACHE_SECONDS = getattr(settings, "MESSAGE_CONTACTS_CACHE_SECONDS", 300)
+
+
+def _version_key(user_id):
+    return f"contacts:version:{user_id}"
+
+
+def _version(user_id):
+    return cache.get_or_set(_version_key(user_id), time.time_ns, None)
+
+
+def invalidate(*user_ids):
+    """Drop every cached contacts page of ``user_ids``."""
+    version = time.time_ns()
+    cache.set_many({_version_key(user_id): version for user_id in user_ids if user_id}, None)
+
+
+class _ContactIndex:
+    """The sidebar order as a sliceable sequence, so :class:`Paginator` pages it in SQL.
+
+    Conversations come first, newest last message first, then people linked by
+    an application but never messaged, newest application first. Slicing runs
+    one grouped query per part and yields
+    ``(contact_id, last_message_id, unread_count, applied_job)`` rows.
+    """
+
+    def __init__(self, user, applicants_only):
+        from .models import JobApplication, Message
+
+        self.user = user
+        if user.profile.role == "employer":
+            self.applications = JobApplication.objects.filter(job__user=user)
+            self.counterpart = "user_id"
+        else:
+            self.applications = JobApplication.objects.filter(user=user)
+            self.counterpart = "job__user_id"
+        linked = self.applications.values(self.counterpart)
+
+        messages = Message.objects.filter(Q(sender=user) | Q(receiver=user), is_deleted=False)
+        if applicants_only:
+            messages = messages.filter(
+                Q(sender=user, receiver_id__in=linked) | Q(receiver=user, sender_id__in=linked)
+            )
+        # Messages are inserted in send order, so the highest id is the latest message.
+        self.threads = messages.order_by().values("conversation_key").annotate(last_id=Max("id")).order_by("-last_id")
+
+        messaged = Message.objects.filter(is_deleted=False)
+        self.seeded = (
+            self.applications
+            .exclude(**{f"{self.counterpart}__in": messaged.filter(sender=user).values("receiver_id")})
+            .exclude(**{f"{self.counterpart}__in": messaged.filter(receiver=user).values("sender_id")})
+            .exclude(**{self.counterpart: user.id})
+            .order_by().values(self.counterpart).annotate(latest_id=Max("id")).order_by("-latest_id")
+        )
+        self._threads_count = None
+
+    def __getstate__(self):
+        # Cached pages keep their paginator, whose counts are computed by then.
+        # Pickling the querysets would evaluate them in full.
+        return {}
+
+    def threads_count(self):
+        if self._threads_count is None:
+            self._threads_count = self.threads.count()
+        return self._threads_count
+
+    def count(self):
+        return self.threads_count() + self.seeded.count()
+
+    def __getitem__(self, index):
+        from .unread import unread_by_sender
+
+        if not isinstance(index, slice):
+            raise TypeError("contact index only supports slicing")
+        start, stop = index.start or 0, index.stop
+        split = self.threads_count()
+
+        rows = []
+        if start < split:
+            for row in self.threads[start:min(stop, split)]:
+                low, high = (int(part) for part in row["conversation_key"].split(":"))
+                rows.append((high if low == self.user.id else low, row["last_id"]))
+        if stop > split:
+            rows.extend(
+                (row[self.counterpart], None)
+                for row in self.seeded[max(start - split, 0):stop - split]
+            )
+
+        contact_ids = [contact_id for contact_id, _ in rows]
+        unread = unread_by_sender(self.user.id, contact_ids)
+        # Latest application per contact on this page (rows come oldest first, so later ones win)
+        applied = dict(
+            self.applications.filter(**{f"{self.counterpart}__in": contact_ids})
+            .order_by("applied_at", "id").values_list(self.counterpart, "job__title")
+        )
+        return [
+            (contact_id, last_id, unread.get(contact_id, 0), applied.get(contact_id))
+            for contact_id, last_id in rows
+        ]
+
+
+def _hydrate(user, rows):
+    from .models import Message, User
+
+    users = User.objects.select_related("profile").in_bulk([row[0] for row in rows])
+    messages = Message.objects.in_bulk([row[1] for row in rows if row[1]])
+
+    contacts = []
+    for contact_id, last_id, unread_count, applied_job in rows:
+        other = users.get(contact_id)
+        if other is None:
+            continue
+        last_message = messages.get(last_id)
+        if last_message is not None:
+            # Both ends are already loaded; avoid a query per template access.
+            last_message.sender = user if last_message.sender_id == user.id else other
+            last_message.receiver = other if last_message.sender_id == user.id else user
+        contacts.append({
+            "user": other,
+            "display_name": other.profile.full_name or other.username,
+            "avatar_url": other.profile.profile_image.url if other.profile.profile_image else None,
+            "last_message": last_message,
+            "unread_count": unread_count,
+            "applied_job": applied_job,
+        })
+    return contacts
+
+
+def sidebar_contacts(user, page=1, applicants_only=False, per_page=CONTACTS_PAGE_SIZE):
+    """Return a :class:`~django.core.paginator.Page` of contact dicts for ``user``.
+
+    Each dict has ``user``, ``display_name``, ``avatar_url``, ``last_message``
+    (or ``None``), ``unread_count`` and ``applied_job``. With
+    ``applicants_only`` only people linked by an application are listed
+    (the employer inbox).
+    """
+    scope = "applicants" if applicants_only else "all"
+    try:
+        page = max(1, int(page))
+    except (TypeError, ValueError):
+        page = 1
+    key = f"contacts:{user.id}:{_version(user.id)}:{scope}:{per_page}:{page}"
+
+    contacts_page = cache.get(key)
+    if contacts_page is None:
+        paginator = Paginator(_ContactIndex(user, applicants_only), per_page)
+        contacts_page = paginator.get_page(page)
+        contacts_page.object_list = _hydrate(user, contacts_page.object_list)
+        cache.set(key, contacts_page, CONTACTS_CACHE_SECONDS)
+    return contacts_page
@@ -0,0 +1,252 @@
+"""Streaming NDJSON backup and restore for every ``main`` model.
+
+The dump is one NDJSON stream (optionally gzip- or zstd-compressed, picked
+by file extension). Each table starts with a header line::
+
+    {"model": "main.job", "fields": ["id", "user_id", "title", ...]}
+
+followed by one JSON array of values per row. Tables are written in
+foreign-key order (parents first), with auto-created many-to-many
+``through`` tables last, so a restore can ``bulk_create`` table by table
+without deferring constraints. Rows are read with ``iterator()`` and
+written/inserted in fixed-size batches, so memory is bounded by the batch
+size, not by the database size.
+
+Many-to-many tables that point outside ``main`` (``User.groups``,
+``User.user_permissions``) are skipped: their targets are not part of the
+dump. :func:`dump` warns when such rows exist. ``load(replace=True)`` also
+deletes the rows of other apps that reference ``main`` tables (those
+memberships, ``django_admin_log``), warning with their counts, since they
+would otherwise fail the foreign-key check at commit.
+"""
+import base64
+import datetime
+import gzip
+import io
+import json
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
+
+APP_LABEL = "main"
+DEFAULT_BATCH_SIZE = 2000
+
+
+class _Encoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            # DjangoJSONEncoder truncates to milliseconds; keep full precision.
+            return o.isoformat()
+        if isinstance(o, (bytes, memoryview)):
+            return base64.b64encode(bytes(o)).decode()
+        return super().default(o)
+
+
+def open_stream(path, mode):
+    """Open ``path`` for binary ``mode`` ("rb"/"wb"), compressing by extension."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd compression needs the 'zstandard' package") from None
+        raw = open(path, mode)
+        if "w" in mode:
+            return zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return open(path, mode)
+
+
+def ordered_models():
+    """Return the app's concrete models parents-first, then local m2m through tables."""
+    app_models = [m for m in apps.get_app_config(APP_LABEL).get_models() if not m._meta.proxy]
+    in_app = set(app_models)
+
+    ordered, done = [], set()
+
+    def visit(model, path=()):
+        if model in done:
+            return
+        if model in path:
+            raise RuntimeError(f"Foreign-key cycle through {model._meta.label}")
+        for field in model._meta.concrete_fields:
+            target = field.related_model if field.is_relation else None
+            if target in in_app and target is not model:
+                visit(target, path + (model,))
+        done.add(model)
+        ordered.append(model)
+
+    for model in app_models:
+        visit(model)
+
+    through = []
+    for model in app_models:
+        for field in model._meta.local_many_to_many:
+            remote = field.remote_field.through
+            if remote._meta.auto_created and field.related_model in in_app:
+                through.append(remote)
+    return ordered + through
+
+
+def skipped_through_models():
+    """Auto-created m2m tables of ``main`` models whose targets are not dumped."""
+    in_app = set(apps.get_app_config(APP_LABEL).get_models())
+    return [
+        field.remote_field.through
+        for model in in_app if not model._meta.proxy
+        for field in model._meta.local_many_to_many
+        if field.remote_field.through._meta.auto_created and field.related_model not in in_app
+    ]
+
+
+def _external_references(known):
+    """``(model, field)`` for every foreign key from outside ``known`` into it."""
+    references = []
+    for model in apps.get_models(include_auto_created=True):
+        if model in known or model._meta.proxy:
+            continue
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model in known:
+                references.append((model, field))
+    return references
+
+
+def _columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def dump(stream, batch_size=DEFAULT_BATCH_SIZE, log=None, warn=None):
+    """Write every table to the binary ``stream``; return ``{label: rows}``."""
+    if warn:
+        for through in skipped_through_models():
+            skipped = through._base_manager.count()
+            if skipped:
+                warn(f"Not dumped: {skipped} row(s) of {through._meta.label} (their targets are outside {APP_LABEL})")
+    writer = io.TextIOWrapper(stream, encoding="utf-8", newline="\n", write_through=False)
+    encoder = _Encoder(ensure_ascii=False, separators=(",", ":"))
+    counts = {}
+    for model in ordered_models():
+        columns = _columns(model)
+        writer.write(encoder.encode({"model": model._meta.label_lower, "fields": columns}) + "\n")
+        rows = model._base_manager.order_by("pk").values_list(*columns).iterator(chunk_size=batch_size)
+        count = 0
+        for row in rows:
+            writer.write(encoder.encode(row) + "\n")
+            count += 1
+        counts[model._meta.label] = count
+        if log:
+            log(f"{model._meta.label}: {count}")
+    writer.flush()
+    writer.detach()
+    return counts
+
+
+def _converters(model, columns):
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    converters = []
+    for column in columns:
+        field = fields.get(column)
+        if field is None:
+            raise ValueError(f"{model._meta.label} has no column {column!r}")
+        if isinstance(field, (models.DateTimeField, models.DateField, models.TimeField,
+                              models.DecimalField, models.BinaryField, models.UUIDField)):
+            converters.append(field.to_python)
+        else:
+            converters.append(None)
+    return converters
+
+
+@contextmanager
+def _stored_timestamps(models_):
+    """Stop auto_now / auto_now_add from overwriting restored timestamps."""
+    switched = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in models_
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    for field, _, _ in switched:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in switched:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _flush(model, batch, batch_size):
+    if batch:
+        model._base_manager.bulk_create(batch, batch_size=batch_size)
+        batch.clear()
+
+
+def load(stream, batch_size=DEFAULT_BATCH_SIZE, replace=False, log=None, warn=None):
+    """Restore a dump from the binary ``stream``; return ``{label: rows}``."""
+    known = {model._meta.label_lower: model for model in ordered_models()}
+    counts = {}
+
+    with transaction.atomic(), _stored_timestamps(known.values()):
+        if replace:
+            # Children first; plain DELETEs avoid loading rows for cascade collection.
+            # Rows of other apps pointing at these tables go first, or the
+            # deferred foreign-key check fails at commit.
+            quote = connection.ops.quote_name
+            with connection.cursor() as cursor:
+                for model, field in _external_references(set(known.values())):
+                    table, column = quote(model._meta.db_table), quote(field.column)
+                    if field.remote_field.on_delete is models.SET_NULL:
+                        cursor.execute(f"UPDATE {table} SET {column} = NULL WHERE {column} IS NOT NULL")
+                        action = "Cleared"
+                    else:
+                        cursor.execute(f"DELETE FROM {table} WHERE {column} IS NOT NULL")
+                        action = "Deleted"
+                    if cursor.rowcount and warn:
+                        warn(f"{action} {cursor.rowcount} row(s) of {model._meta.label} referencing {field.related_model._meta.label}")
+                for model in reversed(list(known.values())):
+                    cursor.execute(f"DELETE FROM {quote(model._meta.db_table)}")
+        else:
+            non_empty = [model._meta.label for model in known.values() if model._base_manager.exists()]
+            if non_empty:
+                raise RuntimeError(f"Target tables are not empty: {', '.join(non_empty)} (use --replace)")
+
+        model = columns = converters = None
+        batch = []
+        for line in io.TextIOWrapper(stream, encoding="utf-8"):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict):
+                _flush(model, batch, batch_size)
+                if model is not None and log:
+                    log(f"{model._meta.label}: {counts[model._meta.label]}")
+                model = known.get(record["model"])
+                if model is None:
+                    raise ValueError(f"Unknown model in dump: {record['model']}")
+                columns = record["fields"]
+                converters = _converters(model, columns)
+                counts[model._meta.label] = 0
+                continue
+
+            values = {
+                column: convert(value) if convert and value is not None else value
+                for column, convert, value in zip(columns, converters, record)
+            }
+            batch.append(model(**values))
+            counts[model._meta.label] += 1
+            if len(batch) >= batch_size:
+                _flush(model, batch, batch_size)
+        _flush(model, batch, batch_size)
+        if model is not None and log:
+            log(f"{model._meta.label}: {counts[model._meta.label]}")
+
+        # Restored explicit primary keys leave PostgreSQL sequences behind.
+        statements = connection.ops.sequence_reset_sql(no_style(), list(known.values()))
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+    return counts
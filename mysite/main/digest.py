@@ -0,0 +1,64 @@
+"""Email digests of notifications missed while offline.
+
+:func:`main.signals.push_notification` pushes a notification over the
+user's socket when :mod:`main.presence` reports them online. Otherwise it
+sets ``Notification.digest_pending``. :func:`send_digests` (run
+periodically via ``python manage.py send_notification_digests``) sends
+each such user one email listing their pending notifications that are
+still unread, then clears the flag. Notifications read in the meantime
+are dropped from the digest, and users online when the command runs are
+skipped until they go offline again.
+"""
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from . import presence
+
+
+def _max_items():
+    return getattr(settings, "NOTIFICATION_DIGEST_MAX_ITEMS", 20)
+
+
+def digest_email(user, notifications, connection=None):
+    count = len(notifications)
+    lines = [f"Hi {user.first_name or user.username},", "", f"You have {count} new notification{'s' if count != 1 else ''}:", ""]
+    for notification in notifications[:_max_items()]:
+        lines.append(f"- {notification.title}: {notification.message}")
+    if count > _max_items():
+        lines.append(f"...and {count - _max_items()} more.")
+    subject = f"You have {count} new notification{'s' if count != 1 else ''}"
+    return EmailMessage(subject, "\n".join(lines), settings.DEFAULT_FROM_EMAIL, [user.email], connection=connection)
+
+
+def send_digests(dry_run=False):
+    """Email every offline user their pending notifications; return ``(users, notifications)``."""
+    from .models import Notification
+
+    pending = Notification.objects.filter(digest_pending=True)
+    # Read since they were created: nothing left to tell the user.
+    if not dry_run:
+        pending.filter(is_read=True).update(digest_pending=False)
+
+    by_user = {}
+    for notification in pending.filter(is_read=False).select_related("user").order_by("created_at"):
+        by_user.setdefault(notification.user_id, []).append(notification)
+    online = presence.online_user_ids(by_user)
+    by_user = {user_id: items for user_id, items in by_user.items() if user_id not in online}
+    if dry_run:
+        return len(by_user), sum(len(items) for items in by_user.values())
+
+    users = notifications = 0
+    connection = get_connection(fail_silently=True)
+    for items in by_user.values():
+        user = items[0].user
+        if user.email:
+            try:
+                sent = connection.send_messages([digest_email(user, items, connection)])
+            except Exception:
+                sent = 0
+            if not sent:
+                continue  # keep the flag and retry on the next run
+            users += 1
+            notifications += len(items)
+        Notification.objects.filter(pk__in=[item.pk for item in items]).update(digest_pending=False)
+    return users, notifications
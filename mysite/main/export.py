@@ -0,0 +1,133 @@
+"""Personal data export ("Download my data" in Settings → Data control).
+
+:func:`stream_export_zip` yields a ZIP archive chunk by chunk. Each section
+is one NDJSON file (one JSON object per line) read with
+``iterator(chunk_size=...)``, and ``zipfile`` writes to a buffer that is
+drained after every chunk, so memory use does not grow with the size of
+the account.
+"""
+import json
+import zipfile
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 500
+
+
+class _ChunkBuffer:
+    """Write-only file object; ``zipfile`` treats it as an unseekable stream."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _profile_rows(user):
+    from .models import Profile
+
+    profile = Profile.objects.filter(user=user).values(
+        "role", "full_name", "phone_number", "location", "bio", "company_name", "profile_image",
+        "preferred_job_titles", "job_categories", "employment_type", "preferred_location",
+        "profile_visibility", "allow_contact", "email_notifications", "push_notifications",
+        "dark_mode", "language", "timezone", "updated_at",
+    ).first() or {}
+    profile.update({
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "date_joined": user.date_joined,
+        "desired_skills": list(user.profile.desired_skills.values_list("name", flat=True)),
+    })
+    yield profile
+
+
+def _message_rows(user, chunk_size):
+    from .models import ArchivedMessage, Message
+
+    mine = Q(sender=user) | Q(receiver=user)
+    yield from Message.objects.filter(mine).order_by("id").values(
+        "id", "sender__username", "receiver__username", "content", "sent_at",
+        "is_read", "is_edited", "edited_at", "is_deleted", "deleted_at",
+    ).iterator(chunk_size=chunk_size)
+    for archived in ArchivedMessage.objects.filter(mine).order_by("id").select_related(
+        "sender", "receiver"
+    ).iterator(chunk_size=chunk_size):
+        yield {
+            "id": archived.id,
+            "sender__username": archived.sender.username,
+            "receiver__username": archived.receiver.username,
+            "content": archived.content,
+            "sent_at": archived.sent_at,
+            "is_edited": archived.is_edited,
+            "is_deleted": archived.is_deleted,
+            "archived": True,
+        }
+
+
+def export_sections(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Return ``[(filename, rows), ...]``; ``rows`` are lazy iterables of dicts."""
+    from .models import JobApplication, Notification, Post, Skill
+
+    return [
+        ("profile.ndjson", _profile_rows(user)),
+        ("skills.ndjson", Skill.objects.filter(user__user=user).order_by("id").values(
+            "id", "name", "level", "description"
+        ).iterator(chunk_size=chunk_size)),
+        ("applications.ndjson", JobApplication.objects.filter(user=user).order_by("id").values(
+            "id", "job_id", "job__title", "job__company_name", "status", "cover_letter", "resume",
+            "applied_at", "interview_scheduled_at", "interview_location", "interview_meeting_url",
+        ).iterator(chunk_size=chunk_size)),
+        ("messages.ndjson", _message_rows(user, chunk_size)),
+        ("notifications.ndjson", Notification.objects.filter(user=user).order_by("id").values(
+            "id", "notification_type", "title", "message", "link", "is_read", "created_at",
+        ).iterator(chunk_size=chunk_size)),
+        ("posts.ndjson", Post.objects.filter(user=user).order_by("id").values(
+            "id", "post_type", "article_title", "content", "image", "video", "created_at",
+        ).iterator(chunk_size=chunk_size)),
+    ]
+
+
+def stream_export_zip(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the bytes of a ZIP containing one NDJSON file per section."""
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, rows in export_sections(user, chunk_size):
+            with archive.open(filename, mode="w") as entry:
+                for index, row in enumerate(rows, 1):
+                    entry.write(json.dumps(row, cls=DjangoJSONEncoder).encode() + b"\n")
+                    if index % chunk_size == 0:
+                        yield buffer.drain()
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+async def astream_export_zip(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Async wrapper for ASGI servers, which would otherwise buffer a sync iterator whole."""
+    chunks = stream_export_zip(user, chunk_size)
+    done = object()
+    # One shared thread keeps the open DB cursors on the connection that created them.
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await next_chunk(chunks, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+def export_filename(user):
+    return f"{user.username}-data-{timezone.now():%Y%m%d}.zip"
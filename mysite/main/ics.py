@@ -0,0 +1,316 @@
+"""iCalendar (RFC 5545) interview events and per-user calendar feeds.
+
+Each scheduled ``JobApplication`` is one VEVENT with the stable UID
+``jobapp-<id>@mysite``. ``interview_sequence`` is bumped (and
+``interview_updated_at``, used as DTSTAMP, restamped) whenever the time,
+length, place or status changes, so calendar clients replace the event
+rather than adding a second one. Lines are CRLF-terminated, TEXT values
+escaped and long lines folded at 75 octets.
+
+Rendered VEVENTs are cached under a hash of their fields, so an event is
+rendered once per change. Each user also has a subscribable feed of every
+interview they take part in (as applicant or job owner) at a signed URL
+(:func:`feed_token`). The signed value includes
+``Profile.calendar_token_version``, so :func:`reset_feed_token` revokes a
+leaked URL. The feed body is cached under a per-user version key, which is
+replaced whenever one of their interviews, jobs, or a participant's
+profile changes, or a job is deleted. The version is also the feed's ETag,
+so a poll with a matching ``If-None-Match`` is answered from the cache
+alone.
+
+Version and body both expire after ``ICS_FEED_CACHE_SECONDS``. That bounds
+staleness for the deletes nothing reports (applications removed directly,
+or cascaded from a deleted user), since JobApplication deliberately has no
+post_delete receiver.
+"""
+import hashlib
+import json
+import uuid
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+
+# Bump when the event layout changes so cached events are re-rendered.
+FORMAT_VERSION = 2
+PRODID = "-//ADS Django//Interviews//EN"
+STATE_FIELDS = (
+    "interview_scheduled_at", "interview_duration_minutes",
+    "interview_location", "interview_meeting_url", "status",
+)
+EVENT_CACHE_KEY = "ics:event:{digest}"
+FEED_VERSION_KEY = "ics:feed-version:{user_id}"
+FEED_CACHE_KEY = "ics:feed:{user_id}:{version}"
+TOKEN_VERSION_KEY = "ics:token-version:{user_id}"
+FEED_SIGNER_SALT = "main.ics.feed"
+
+
+# ---- formatting -------------------------------------------------------------
+
+def escape_text(value):
+    """Escape a TEXT property value (RFC 5545 3.3.11)."""
+    return (
+        str(value).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n").replace("\r", "\\n")
+    )
+
+
+def param_text(value):
+    """A quoted parameter value (RFC 5545 3.2): no DQUOTE or control characters."""
+    cleaned = "".join(" " if ord(char) < 32 or char == "\x7f" else char for char in str(value))
+    return '"' + cleaned.replace('"', "'") + '"'
+
+
+def single_line(value):
+    """A URI/CAL-ADDRESS value, which cannot be escaped: drop CR/LF so it cannot add properties."""
+    return str(value).replace("\r", "").replace("\n", "")
+
+
+def fold(line):
+    """Fold a content line into chunks of at most 75 octets (RFC 5545 3.1).
+
+    Continuation lines start with a space. Multi-byte UTF-8 characters are
+    never split.
+    """
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    chunks, limit = [], 75
+    while len(data) > limit:
+        cut = limit
+        while data[cut] & 0xC0 == 0x80:  # continuation byte: back up to the character start
+            cut -= 1
+        chunks.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        limit = 74  # leave room for the leading space
+    chunks.append(data.decode("utf-8"))
+    return "\r\n ".join(chunks)
+
+
+def format_dt(dt):
+    return dt.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+# ---- events -----------------------------------------------------------------
+
+def interview_state(application):
+    """The fields an event depends on, or None if any of them was deferred."""
+    if any(field not in application.__dict__ for field in STATE_FIELDS):
+        return None
+    return tuple(application.__dict__[field] for field in STATE_FIELDS)
+
+
+def event_fields(application):
+    """Everything written into the application's VEVENT, JSON-ready."""
+    start = application.interview_scheduled_at
+    job = application.job
+    applicant = application.user
+    employer = job.user
+    profile = getattr(applicant, "profile", None)
+    applicant_name = (profile.full_name if profile else "") or applicant.username
+    return {
+        "uid": f"jobapp-{application.id}@mysite",
+        "sequence": application.interview_sequence,
+        "dtstamp": format_dt(application.interview_updated_at or start),
+        "start": format_dt(start),
+        "end": format_dt(start + timedelta(minutes=application.interview_duration_minutes)),
+        "summary": f"Interview: {job.title}",
+        "description": "\n".join(filter(None, [
+            f"Job: {job.title}",
+            f"Company: {job.company_name}" if job.company_name else "",
+            f"Applicant: {applicant_name}",
+            f"Meeting URL: {application.interview_meeting_url}" if application.interview_meeting_url else "",
+            f"Location: {application.interview_location}" if application.interview_location else "",
+        ])),
+        "location": application.interview_location or application.interview_meeting_url or "",
+        "url": application.interview_meeting_url or "",
+        "cancelled": application.status == "Rejected",
+        "organizer": employer.email or settings.DEFAULT_FROM_EMAIL,
+        "attendee": applicant.email or "",
+        "attendee_name": applicant_name,
+    }
+
+
+def _digest(payload):
+    return hashlib.sha256(json.dumps([FORMAT_VERSION, payload], sort_keys=True).encode()).hexdigest()[:32]
+
+
+def render_event(fields):
+    """The folded, CRLF-terminated VEVENT block for ``fields``."""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{fields['uid']}",
+        f"SEQUENCE:{fields['sequence']}",
+        f"DTSTAMP:{fields['dtstamp']}",
+        f"DTSTART:{fields['start']}",
+        f"DTEND:{fields['end']}",
+        f"SUMMARY:{escape_text(fields['summary'])}",
+        f"DESCRIPTION:{escape_text(fields['description'])}",
+    ]
+    if fields["location"]:
+        lines.append(f"LOCATION:{escape_text(fields['location'])}")
+    if fields["url"]:
+        lines.append(f"URL:{single_line(fields['url'])}")
+    lines.append(f"ORGANIZER:mailto:{single_line(fields['organizer'])}")
+    if fields["attendee"]:
+        lines.append(
+            f"ATTENDEE;CN={param_text(fields['attendee_name'])};ROLE=REQ-PARTICIPANT;RSVP=TRUE"
+            f":mailto:{single_line(fields['attendee'])}"
+        )
+    lines.append("STATUS:CANCELLED" if fields["cancelled"] else "STATUS:CONFIRMED")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) + "\r\n" for line in lines)
+
+
+def cached_event(application):
+    """Return ``(vevent, digest)``, rendering only if this version is not cached."""
+    fields = event_fields(application)
+    digest = _digest(fields)
+    key = EVENT_CACHE_KEY.format(digest=digest)
+    block = cache.get(key)
+    if block is None:
+        block = render_event(fields)
+        cache.set(key, block, _feed_cache_seconds())
+    return block, digest
+
+
+def calendar(events, method=None, name=None):
+    """Wrap rendered VEVENT blocks in a VCALENDAR."""
+    head = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN"]
+    if method:
+        head.append(f"METHOD:{method}")
+    if name:
+        head.append(f"X-WR-CALNAME:{escape_text(name)}")
+    return "".join(fold(line) + "\r\n" for line in head) + "".join(events) + "END:VCALENDAR\r\n"
+
+
+def invite(application, method="PUBLISH"):
+    """Return ``(ics, digest)`` for one scheduled interview; ``method="REQUEST"`` for email."""
+    block, digest = cached_event(application)
+    return calendar([block], method=method), f"{digest}-{method.lower()}"
+
+
+# ---- change tracking --------------------------------------------------------
+
+def interview_changed(application):
+    """Bump the event's SEQUENCE/DTSTAMP after a save and drop the affected feeds."""
+    from .models import JobApplication
+
+    JobApplication.objects.filter(pk=application.pk).update(
+        interview_sequence=F("interview_sequence") + 1, interview_updated_at=timezone.now(),
+    )
+    application.refresh_from_db(fields=["interview_sequence", "interview_updated_at"])
+    invalidate_feeds([application.user_id, application.job.user_id])
+
+
+def invalidate_feeds(user_ids):
+    cache.set_many(
+        {FEED_VERSION_KEY.format(user_id=user_id): uuid.uuid4().hex[:16] for user_id in set(user_ids)},
+        _feed_cache_seconds(),
+    )
+
+
+def _participants(applications):
+    user_ids = set()
+    for applicant_id, employer_id in applications.filter(interview_scheduled_at__isnull=False).values_list(
+        "user_id", "job__user_id"
+    ):
+        user_ids.update((applicant_id, employer_id))
+    return user_ids
+
+
+def invalidate_job_feeds(job_ids):
+    """Jobs are being edited or deleted: their title and company appear in their interviews' events.
+
+    Call before deleting, while the applications still exist.
+    """
+    from .models import JobApplication
+
+    user_ids = _participants(JobApplication.objects.filter(job_id__in=job_ids))
+    if user_ids:
+        invalidate_feeds(user_ids)
+
+
+def invalidate_user_feeds(user_id):
+    """A user's name or email changed: refresh every feed they appear in."""
+    from .models import JobApplication
+
+    user_ids = _participants(JobApplication.objects.filter(Q(user_id=user_id) | Q(job__user_id=user_id)))
+    if user_ids:
+        invalidate_feeds(user_ids)
+
+
+# ---- feeds ------------------------------------------------------------------
+
+def _feed_cache_seconds():
+    return getattr(settings, "ICS_FEED_CACHE_SECONDS", 3600)
+
+
+def token_version(user_id):
+    """The user's current ``Profile.calendar_token_version``, cached."""
+    from .models import Profile
+
+    return cache.get_or_set(
+        TOKEN_VERSION_KEY.format(user_id=user_id),
+        lambda: Profile.objects.filter(user_id=user_id).values_list("calendar_token_version", flat=True).first(),
+        _feed_cache_seconds(),
+    )
+
+
+def feed_token(user):
+    return signing.Signer(salt=FEED_SIGNER_SALT).sign(f"{user.pk}:{token_version(user.pk)}")
+
+
+def user_id_for_token(token):
+    """The feed owner's id, or None if the token is forged or was reset."""
+    try:
+        user_id, version = map(int, signing.Signer(salt=FEED_SIGNER_SALT).unsign(token).split(":"))
+    except (signing.BadSignature, ValueError):
+        return None
+    if version != token_version(user_id):
+        return None
+    return user_id
+
+
+def reset_feed_token(user):
+    """Revoke the user's feed URL; the next :func:`feed_token` is a new one."""
+    from .models import Profile
+
+    Profile.objects.filter(user=user).update(calendar_token_version=F("calendar_token_version") + 1)
+    cache.delete(TOKEN_VERSION_KEY.format(user_id=user.pk))
+
+
+def feed_version(user_id):
+    key = FEED_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex[:16]
+        # add() so two first polls agree on one version
+        if not cache.add(key, version, _feed_cache_seconds()):
+            version = cache.get(key, version)
+    return version
+
+
+def feed(user_id, version):
+    """The user's interview calendar, rendered at most once per version."""
+    from .models import JobApplication
+
+    key = FEED_CACHE_KEY.format(user_id=user_id, version=version)
+    body = cache.get(key)
+    if body is not None:
+        return body
+
+    since = timezone.now() - timedelta(days=getattr(settings, "ICS_FEED_PAST_DAYS", 90))
+    applications = (
+        JobApplication.objects.filter(Q(user_id=user_id) | Q(job__user_id=user_id))
+        .filter(interview_scheduled_at__gte=since)
+        .select_related("job__user", "user__profile")
+        .order_by("interview_scheduled_at")
+    )
+    body = calendar([cached_event(application)[0] for application in applications], method="PUBLISH", name="Interviews")
+    cache.set(key, body, _feed_cache_seconds())
+    return body
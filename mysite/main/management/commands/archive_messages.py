@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.archive import archive_messages, compact, retention_filter
+
+
+class Command(BaseCommand):
+    help = "Move old and soft-deleted messages from Message into ArchivedMessage in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than-days", type=int, default=None,
+                            help="Archive read messages older than this (default: MESSAGE_RETENTION_DAYS)")
+        parser.add_argument("--deleted-older-than-days", type=int, default=None,
+                            help="Archive soft-deleted messages deleted before this (default: MESSAGE_DELETED_RETENTION_DAYS)")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Count matching rows without moving them")
+        parser.add_argument("--compact", action="store_true", help="VACUUM and optimise the search index afterwards (SQLite)")
+
+    def handle(self, *args, **options):
+        due = retention_filter(
+            retention_days=options["older_than_days"],
+            deleted_retention_days=options["deleted_older_than_days"],
+        )
+        started = time.perf_counter()
+        total = batches = 0
+        for moved in archive_messages(due, batch_size=options["batch_size"], dry_run=options["dry_run"]):
+            total += moved
+            batches += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  batch {batches}: {moved} message(s)")
+
+        verb = "Would archive" if options["dry_run"] else "Archived"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {total} message(s) in {batches} batch(es) ({time.perf_counter() - started:.2f}s)."
+        ))
+
+        if options["compact"] and not options["dry_run"]:
+            if compact():
+                self.stdout.write("Compacted database.")
+            else:
+                self.stdout.write("Compaction is only supported on SQLite; skipped.")
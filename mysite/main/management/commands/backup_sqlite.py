@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from main.dbtuning import backup
+
+
+class Command(BaseCommand):
+    help = "Copy the live SQLite database to a file using the online backup API"
+
+    def add_arguments(self, parser):
+        parser.add_argument("destination", help="Path of the backup file to write")
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--pages", type=int, default=1024,
+                            help="Pages copied per step; writers may run between steps")
+
+    def handle(self, *args, **options):
+        def progress(status, remaining, total):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {total - remaining}/{total} pages")
+
+        try:
+            backup(options["destination"], using=options["database"], pages=options["pages"], progress=progress)
+        except RuntimeError as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(f"Backed up to {options['destination']}"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from main.dbtuning import run_write_benchmark, sqlite_pragmas
+
+# What a stock Django SQLite connection runs with
+STOCK_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent write throughput with stock and tuned SQLite settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--writes", type=int, default=200, help="Transactions per thread")
+
+    def handle(self, *args, **options):
+        runs = (
+            ("stock", STOCK_PRAGMAS, "BEGIN"),
+            ("tuned", sqlite_pragmas(), "BEGIN IMMEDIATE"),
+        )
+        for label, pragmas, begin in runs:
+            rate, errors = run_write_benchmark(
+                pragmas, threads=options["threads"], writes_per_thread=options["writes"], begin=begin
+            )
+            locked = sum("locked" in error for error in errors)
+            self.stdout.write(f"{label:>5}: {rate:8.0f} writes/s, {len(errors)} failed ({locked} 'database is locked')")
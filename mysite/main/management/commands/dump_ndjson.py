@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.datadump import DEFAULT_BATCH_SIZE, dump, open_stream
+
+
+class Command(BaseCommand):
+    help = "Stream every main model to an NDJSON file (.gz / .zst to compress)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Output file, e.g. backup.ndjson.gz")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open_stream(options["path"], "wb") as stream:
+                counts = dump(stream, batch_size=options["batch_size"],
+                              log=self.stdout.write if options["verbosity"] > 1 else None,
+                              warn=lambda message: self.stderr.write(self.style.WARNING(message)))
+        except RuntimeError as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(
+            f"Dumped {sum(counts.values())} row(s) from {len(counts)} table(s) to {options['path']} "
+            f"in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.datadump import DEFAULT_BATCH_SIZE, load, open_stream
+
+
+class Command(BaseCommand):
+    help = "Restore a dump written by dump_ndjson using bulk_create"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Dump file (.ndjson, .gz or .zst)")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument("--replace", action="store_true",
+                            help="Delete existing rows in the main tables before loading")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open_stream(options["path"], "rb") as stream:
+                counts = load(stream, batch_size=options["batch_size"], replace=options["replace"],
+                              log=self.stdout.write if options["verbosity"] > 1 else None,
+                              warn=lambda message: self.stderr.write(self.style.WARNING(message)))
+        except (RuntimeError, ValueError) as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {sum(counts.values())} row(s) into {len(counts)} table(s) "
+            f"in {time.perf_counter() - started:.2f}s."
+        ))
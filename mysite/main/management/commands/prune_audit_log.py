@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main import audit
+
+
+class Command(BaseCommand):
+    help = "Delete audit log entries from months older than the retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-months", type=int, default=getattr(settings, "AUDIT_LOG_RETENTION_MONTHS", 12),
+            help="Number of months to keep, counting the current one (default: AUDIT_LOG_RETENTION_MONTHS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true", help="Only count the entries that would be deleted.")
+
+    def handle(self, *args, **options):
+        if options["keep_months"] < 1:
+            self.stderr.write("--keep-months must be at least 1")
+            return
+        count = audit.prune(options["keep_months"], batch_size=options["batch_size"], dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write(f"{count} audit log entries would be deleted")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {count} audit log entries"))
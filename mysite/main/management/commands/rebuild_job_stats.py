@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from main import analytics
+
+
+class Command(BaseCommand):
+    help = "Recount per-job analytics (JobStats, JobDailyStat) from applications and saves; view counts are kept"
+
+    def handle(self, *args, **options):
+        jobs, days = analytics.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {jobs} job(s) and {days} job-day row(s)"))
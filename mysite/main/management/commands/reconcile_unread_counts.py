@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from main.unread import reconcile
+
+
+class Command(BaseCommand):
+    help = "Rebuild ConversationUnread rows and Profile.unread_messages_count from Message"
+
+    def handle(self, *args, **options):
+        conversations, profiles = reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {conversations} conversation counter(s); corrected {profiles} profile total(s)."
+        ))
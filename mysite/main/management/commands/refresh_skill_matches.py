@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from main import matching
+from main.models import JobApplication
+
+
+class Command(BaseCommand):
+    help = "Recompute every application's skill match against the employer's desired skills"
+
+    def handle(self, *args, **options):
+        changed = matching.refresh(JobApplication.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Updated {changed} application(s)"))
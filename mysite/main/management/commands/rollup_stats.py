@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import rollups
+
+
+class Command(BaseCommand):
+    help = "Fold rows created since the last run into the DailyStat rollups used by the admin dashboard"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--rebuild", action="store_true", help="Discard existing rollups and recount from scratch")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            rollups.reset()
+        log = self.stdout.write if options["verbosity"] > 1 else None
+        started = time.perf_counter()
+        processed = rollups.run(batch_size=options["batch_size"], log=log)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {sum(processed.values())} rows in {time.perf_counter() - started:.2f}s"
+        ))
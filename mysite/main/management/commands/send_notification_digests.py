@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from main import digest
+
+
+class Command(BaseCommand):
+    help = "Email offline users the notifications they have not seen yet (run periodically, e.g. hourly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only count the digests that would be sent.")
+
+    def handle(self, *args, **options):
+        users, notifications = digest.send_digests(dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write(f"{users} digest(s) covering {notifications} notification(s) would be sent")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Sent {users} digest(s) covering {notifications} notification(s)"))
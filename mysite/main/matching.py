@@ -0,0 +1,96 @@
+"""Applicant/desired-skill matching for ``employer_applicants``.
+
+Each ``JobApplication`` stores ``skill_match_count`` (how many of the
+employer's desired skills the applicant lists, compared case-insensitively
+by name) and ``skill_match_score`` (that count over the number of desired
+skills). The applicants page filters and sorts on these columns instead of
+joining through profiles and skills with ``DISTINCT``.
+
+The values are set when an application is created and refreshed when an
+applicant's skills change (``Skill`` save/delete) or an employer's desired
+skills change (``Profile.desired_skills`` m2m_changed). Refreshes read the
+skill names in two queries and write with ``bulk_update``.
+``python manage.py refresh_skill_matches`` recomputes every application.
+"""
+from collections import defaultdict
+
+BATCH_SIZE = 1000
+
+
+def _normalise(name):
+    return (name or "").strip().lower()
+
+
+def _applicant_skills(user_ids):
+    from .models import Skill
+
+    skills = defaultdict(set)
+    for user_id, name in Skill.objects.filter(user__user_id__in=user_ids).values_list("user__user_id", "name"):
+        skills[user_id].add(_normalise(name))
+    return skills
+
+
+def _desired_skills(employer_ids):
+    from .models import Profile
+
+    desired = defaultdict(set)
+    through = Profile.desired_skills.through
+    for employer_id, name in through.objects.filter(profile__user_id__in=employer_ids).values_list(
+        "profile__user_id", "skilltag__name"
+    ):
+        desired[employer_id].add(_normalise(name))
+    return desired
+
+
+def score(applicant_skills, desired_skills):
+    """Return ``(count, score)`` for two sets of normalised skill names."""
+    if not desired_skills:
+        return 0, 0.0
+    matched = len(applicant_skills & desired_skills)
+    return matched, matched / len(desired_skills)
+
+
+def apply_score(application):
+    """Set the match fields on an unsaved application (pre_save on create)."""
+    from .models import Job
+
+    employer_id = Job.objects.filter(pk=application.job_id).values_list("user_id", flat=True).first()
+    desired = _desired_skills([employer_id]).get(employer_id, set())
+    applicant = _applicant_skills([application.user_id]).get(application.user_id, set())
+    application.skill_match_count, application.skill_match_score = score(applicant, desired)
+
+
+def refresh(applications):
+    """Recompute the match fields for an application queryset; return rows changed."""
+    JobApplication = applications.model
+    changed = 0
+    rows = applications.order_by("pk").values_list(
+        "pk", "user_id", "job__user_id", "skill_match_count", "skill_match_score"
+    )
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            return changed
+        last_pk = batch[-1][0]
+        applicant = _applicant_skills({row[1] for row in batch})
+        desired = _desired_skills({row[2] for row in batch})
+        updates = []
+        for pk, user_id, employer_id, old_count, old_score in batch:
+            count, value = score(applicant.get(user_id, set()), desired.get(employer_id, set()))
+            if (count, value) != (old_count, old_score):
+                updates.append(JobApplication(pk=pk, skill_match_count=count, skill_match_score=value))
+        JobApplication._base_manager.bulk_update(updates, ["skill_match_count", "skill_match_score"], batch_size=BATCH_SIZE)
+        changed += len(updates)
+
+
+def refresh_for_applicant(user_id):
+    from .models import JobApplication
+
+    return refresh(JobApplication.objects.filter(user_id=user_id))
+
+
+def refresh_for_employer(user_id):
+    from .models import JobApplication
+
+    return refresh(JobApplication.objects.filter(job__user_id=user_id))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:26
+
+from django.db import migrations, models
+
+
+def backfill_conversation_key(apps, schema_editor):
+    Message = apps.get_model('main', 'Message')
+    pairs = Message.objects.order_by().values_list('sender_id', 'receiver_id').distinct()
+    for sender_id, receiver_id in pairs:
+        low, high = sorted((sender_id, receiver_id))
+        Message.objects.filter(sender_id=sender_id, receiver_id=receiver_id).update(
+            conversation_key=f"{low}:{high}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0006_profile_desired_skills'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='conversation_key',
+            field=models.CharField(blank=True, editable=False, max_length=41),
+        ),
+        migrations.RunPython(backfill_conversation_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation_key', 'sent_at', 'id'], name='message_conversation_idx'),
+        ),
+    ]
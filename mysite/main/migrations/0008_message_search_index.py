@@ -0,0 +1,49 @@
+"""Full-text index over Message.content.
+
+SQLite: an FTS5 table plus triggers on main_message (see main.search).
+PostgreSQL: a pg_trgm GIN index so ``content__icontains`` is index-backed.
+"""
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS main_message_content_trgm ON main_message USING gin (content gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS main_message_content_trgm",
+]
+
+
+def create_index(apps, schema_editor):
+    from main import search
+
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        search.install_sqlite_index(connection)
+    elif connection.vendor == "postgresql":
+        for sql in POSTGRES_FORWARD:
+            schema_editor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    from main import search
+
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        search.drop_sqlite_index(connection)
+    elif connection.vendor == "postgresql":
+        for sql in POSTGRES_REVERSE:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0007_message_conversation_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
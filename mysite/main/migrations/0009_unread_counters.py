@@ -0,0 +1,65 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_counters(apps, schema_editor):
+    Message = apps.get_model('main', 'Message')
+    ConversationUnread = apps.get_model('main', 'ConversationUnread')
+    Profile = apps.get_model('main', 'Profile')
+
+    rows = (
+        Message.objects.filter(is_read=False, is_deleted=False)
+        .order_by().values('receiver_id', 'sender_id').annotate(n=Count('id'))
+    )
+    ConversationUnread.objects.bulk_create([
+        ConversationUnread(user_id=row['receiver_id'], other_user_id=row['sender_id'], count=row['n'])
+        for row in rows
+    ], batch_size=500)
+    totals = ConversationUnread.objects.values('user_id').annotate(total=Sum('count'))
+    for row in totals:
+        Profile.objects.filter(user_id=row['user_id']).update(unread_messages_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_message_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationUnread',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='unread_messages_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['receiver', 'sender', 'is_read'], name='message_unread_idx'),
+        ),
+        migrations.AddField(
+            model_name='conversationunread',
+            name='other_user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='conversationunread',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_conversations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterUniqueTogether(
+            name='conversationunread',
+            unique_together={('user', 'other_user')},
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
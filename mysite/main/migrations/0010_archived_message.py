@@ -0,0 +1,29 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_unread_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('conversation_key', models.CharField(db_index=True, max_length=41)),
+                ('sent_at', models.DateTimeField()),
+                ('content_compressed', models.BinaryField(blank=True, default=b'')),
+                ('is_edited', models.BooleanField(default=False)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('receiver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:41
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_buckets(apps, schema_editor):
+    AuditLog = apps.get_model('main', 'AuditLog')
+    utc = datetime.timezone.utc
+    AuditLog.objects.update(
+        bucket=ExtractYear('timestamp', tzinfo=utc) * 100 + ExtractMonth('timestamp', tzinfo=utc)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_auditlog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='bucket',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_buckets, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-timestamp', '-id'], name='auditlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['bucket', '-timestamp'], name='auditlog_bucket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', '-timestamp'], name='auditlog_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['ip_address', '-timestamp'], name='auditlog_ip_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['action'], name='auditlog_action_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('main', '0012_auditlog_bucket'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', '-id'], name='job_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['title', 'id'], name='job_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-date_joined', '-id'], name='user_joined_idx'),
+        ),
+    ]
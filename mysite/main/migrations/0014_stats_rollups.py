@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('metric', models.CharField(max_length=50)),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('metric', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_job_stats(apps, schema_editor):
+    from main import analytics
+
+    analytics.rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobStats',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='main.job')),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('saves', models.PositiveIntegerField(default=0)),
+                ('applications', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('reviewed_count', models.PositiveIntegerField(default=0)),
+                ('interview_count', models.PositiveIntegerField(default=0)),
+                ('accepted_count', models.PositiveIntegerField(default=0)),
+                ('rejected_count', models.PositiveIntegerField(default=0)),
+                ('responded_count', models.PositiveIntegerField(default=0)),
+                ('response_seconds_total', models.BigIntegerField(default=0)),
+                ('last_application_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='first_response_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='JobDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('saves', models.PositiveIntegerField(default=0)),
+                ('applications', models.PositiveIntegerField(default=0)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='main.job')),
+            ],
+            options={
+                'unique_together': {('job', 'date')},
+            },
+        ),
+        migrations.RunPython(backfill_job_stats, migrations.RunPython.noop),
+    ]
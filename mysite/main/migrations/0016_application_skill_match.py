@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:52
+
+from django.db import migrations, models
+
+
+def score_existing_applications(apps, schema_editor):
+    from main import matching
+
+    matching.refresh(apps.get_model("main", "JobApplication")._base_manager.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_job_analytics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='skill_match_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='skill_match_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', '-skill_match_score', '-applied_at'], name='application_match_idx'),
+        ),
+        migrations.RunPython(score_existing_applications, migrations.RunPython.noop),
+    ]
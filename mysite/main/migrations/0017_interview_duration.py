@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-19 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_application_skill_match'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='interview_duration_minutes',
+            field=models.PositiveSmallIntegerField(default=45),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['user', 'interview_scheduled_at'], name='application_interview_idx'),
+        ),
+    ]
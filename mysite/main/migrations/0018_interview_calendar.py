@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_interview_duration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='interview_sequence',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='interview_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
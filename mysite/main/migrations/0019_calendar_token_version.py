@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0018_interview_calendar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='calendar_token_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
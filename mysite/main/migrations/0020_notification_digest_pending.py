@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_calendar_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='digest_pending',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+    ]
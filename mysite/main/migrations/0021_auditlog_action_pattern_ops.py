@@ -0,0 +1,21 @@
+# Generated by Django 5.2.9 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_notification_digest_pending'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auditlog',
+            name='auditlog_action_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['action'], name='auditlog_action_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
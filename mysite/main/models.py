@@ -1,6 +1,10 @@
+import zlib
+from datetime import timezone as dt_timezone
+
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
+from django.utils import timezone
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -28,6 +32,12 @@ class User(AbstractUser):
         blank=True
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Admin user list: newest first, keyset-paginated
+            models.Index(fields=['-date_joined', '-id'], name='user_joined_idx'),
+        ]
+
 # =========================
 #           PROFILE
 # =========================
@@ -47,6 +57,8 @@ class Profile(models.Model):
 
     # Personal info
     full_name = models.CharField(max_length=255, blank=True, null=True)
+    # Part of the signed calendar feed URL; bumped to revoke it (main/ics.py)
+    calendar_token_version = models.PositiveIntegerField(default=0, editable=False)
     phone_number = models.CharField(max_length=50, blank=True, null=True)
     location = models.CharField(max_length=255, blank=True, null=True)
     bio = models.TextField(blank=True, null=True)
@@ -85,6 +97,9 @@ class Profile(models.Model):
     language = models.CharField(max_length=10, default='en', blank=True)
     timezone = models.CharField(max_length=50, default='UTC', blank=True)
 
+    # Messaging: unread messages across all conversations (see main/unread.py)
+    unread_messages_count = models.PositiveIntegerField(default=0)
+
     # Timestamps
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -176,6 +191,13 @@ class Job(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     skills = models.ManyToManyField(SkillTag, blank=True, related_name='jobs')
 
+    class Meta:
+        indexes = [
+            # Admin job list: status filter and title sort, keyset-paginated
+            models.Index(fields=['status', '-id'], name='job_status_idx'),
+            models.Index(fields=['title', 'id'], name='job_title_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -206,10 +228,62 @@ class JobApplication(models.Model):
     interview_scheduled_at = models.DateTimeField(blank=True, null=True)
     interview_location = models.CharField(max_length=255, blank=True, null=True)
     interview_meeting_url = models.CharField(max_length=500, blank=True, null=True)
+    interview_duration_minutes = models.PositiveSmallIntegerField(default=45)
+    # Calendar event revision and DTSTAMP, bumped on each schedule change (main/ics.py)
+    interview_sequence = models.PositiveIntegerField(default=0, editable=False)
+    interview_updated_at = models.DateTimeField(blank=True, null=True, editable=False)
+    # First time the employer moved it out of Pending (main/analytics.py)
+    first_response_at = models.DateTimeField(blank=True, null=True, editable=False)
+    # Applicant skills matching the employer's desired skills (main/matching.py)
+    skill_match_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    skill_match_score = models.FloatField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', '-skill_match_score', '-applied_at'], name='application_match_idx'),
+            models.Index(fields=['user', 'interview_scheduled_at'], name='application_interview_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} → {self.job.title}"
 
+class JobStats(models.Model):
+    """Per-job funnel counters kept up to date by main/analytics.py."""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    views = models.PositiveIntegerField(default=0)
+    saves = models.PositiveIntegerField(default=0)
+    applications = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    reviewed_count = models.PositiveIntegerField(default=0)
+    interview_count = models.PositiveIntegerField(default=0)
+    accepted_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    # Sum/count of (first_response_at - applied_at) over responded applications
+    responded_count = models.PositiveIntegerField(default=0)
+    response_seconds_total = models.BigIntegerField(default=0)
+    last_application_at = models.DateTimeField(blank=True, null=True)
+
+    @property
+    def avg_response_seconds(self):
+        return self.response_seconds_total / self.responded_count if self.responded_count else None
+
+    def __str__(self):
+        return f"Stats for job {self.job_id}"
+
+class JobDailyStat(models.Model):
+    """Per-job, per-day views/saves/applications (UTC days)."""
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    saves = models.PositiveIntegerField(default=0)
+    applications = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('job', 'date')
+
+    def __str__(self):
+        return f"Job {self.job_id} {self.date}"
+
 # =========================
 #        NOTIFICATIONS
 # =========================
@@ -229,6 +303,8 @@ class Notification(models.Model):
     title = models.CharField(max_length=255, default='Notification')
     message = models.CharField(max_length=255)
     is_read = models.BooleanField(default=False)
+    # Created while the user was offline; cleared once emailed (main/digest.py)
+    digest_pending = models.BooleanField(default=False, db_index=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     link = models.CharField(max_length=500, blank=True, null=True)
     related_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications_from', blank=True, null=True)
@@ -263,11 +339,65 @@ class Message(models.Model):
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    # "<lower user id>:<higher user id>" - identifies the thread regardless of direction
+    conversation_key = models.CharField(max_length=41, blank=True, editable=False)
+
     def __str__(self):
         return f"{self.sender} → {self.receiver}"
+
+    @staticmethod
+    def conversation_key_for(user_a_id, user_b_id):
+        low, high = sorted((int(user_a_id), int(user_b_id)))
+        return f"{low}:{high}"
+
+    def save(self, *args, **kwargs):
+        if not self.conversation_key:
+            self.conversation_key = self.conversation_key_for(self.sender_id, self.receiver_id)
+        super().save(*args, **kwargs)
     
     class Meta:
         ordering = ['sent_at']
+        indexes = [
+            models.Index(fields=['conversation_key', 'sent_at', 'id'], name='message_conversation_idx'),
+            models.Index(fields=['receiver', 'sender', 'is_read'], name='message_unread_idx'),
+        ]
+
+
+class ConversationUnread(models.Model):
+    """Unread messages from ``other_user`` waiting for ``user`` (kept by main/unread.py)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='unread_conversations')
+    other_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'other_user')
+
+    def __str__(self):
+        return f"{self.user} has {self.count} unread from {self.other_user}"
+
+
+class ArchivedMessage(models.Model):
+    """Cold copy of a ``Message`` moved out of the hot table (see main/archive.py).
+
+    Keeps the original id; the text is zlib-compressed and is empty for
+    messages that were soft-deleted before archiving.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    receiver = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    conversation_key = models.CharField(max_length=41, db_index=True)
+    sent_at = models.DateTimeField()
+    content_compressed = models.BinaryField(blank=True, default=b'')
+    is_edited = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def content(self):
+        return zlib.decompress(self.content_compressed).decode() if self.content_compressed else ""
+
+    def __str__(self):
+        return f"{self.sender_id} → {self.receiver_id} (archived)"
 
 # =========================
 #      CONTACT/POSTS/SAVED
@@ -314,12 +444,60 @@ class SavedJob(models.Model):
 class AuditLog(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     action = models.CharField(max_length=255)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens; entries are written later in batches (main/audit.py)
+    timestamp = models.DateTimeField(default=timezone.now)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
+    # Month of ``timestamp`` as YYYYMM; lets date filters and pruning work on whole months
+    bucket = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return f"{self.user} - {self.action}"
 
+    @staticmethod
+    def bucket_for(moment):
+        if timezone.is_aware(moment):
+            moment = moment.astimezone(dt_timezone.utc)
+        return moment.year * 100 + moment.month
+
+    def save(self, *args, **kwargs):
+        if not self.bucket:
+            self.bucket = self.bucket_for(self.timestamp)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='auditlog_timestamp_idx'),
+            models.Index(fields=['bucket', '-timestamp'], name='auditlog_bucket_idx'),
+            models.Index(fields=['user', '-timestamp'], name='auditlog_user_idx'),
+            models.Index(fields=['ip_address', '-timestamp'], name='auditlog_ip_idx'),
+            # pattern_ops so PostgreSQL can serve LIKE 'prefix%' from it (ignored elsewhere)
+            models.Index(fields=['action'], name='auditlog_action_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+# =========================
+#       STATS ROLLUPS
+# =========================
+class DailyStat(models.Model):
+    """Per-day event count for one metric, maintained by ``rollup_stats`` (main/rollups.py)."""
+    date = models.DateField()
+    metric = models.CharField(max_length=50)
+    value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('metric', 'date')
+
+    def __str__(self):
+        return f"{self.metric} {self.date}: {self.value}"
+
+class StatWatermark(models.Model):
+    """Highest source-row id already counted into DailyStat for a metric."""
+    metric = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.metric} @ {self.last_id}"
+
 # =========================
 #         SIGNALS
 # =========================
@@ -0,0 +1,20 @@
+"""Keyset (seek) pagination helpers.
+
+Pages are addressed by the last row seen instead of an OFFSET, so fetching
+page N costs the same as page 1 as long as an index covers the sort key.
+"""
+from django.db.models import Q
+
+
+def keyset_filter(queryset, field, value, pk, descending=True):
+    """Restrict ``queryset`` to rows after ``(value, pk)`` in ``(field, pk)`` order."""
+    op = "lt" if descending else "gt"
+    return queryset.filter(
+        Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"pk__{op}": pk})
+    )
+
+
+def take_page(queryset, limit):
+    """Evaluate ``limit`` rows plus one look-ahead row; return ``(rows, has_more)``."""
+    rows = list(queryset[:limit + 1])
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,184 @@
+"""Interview invitation PDFs, rendered once per schedule and cached on disk.
+
+The ReportLab styles are built once at import. A rendered invite is stored
+as ``<INTERVIEW_PDF_CACHE_DIR>/<application id>-<hash>.pdf`` where the hash
+covers every field printed on it, so rescheduling (or renaming the job)
+produces a new file and the old one is removed. The same hash is the ETag.
+
+The cache directory holds personal data and must not be web-served; it
+defaults to ``BASE_DIR/cache/interview_pdfs`` rather than ``MEDIA_ROOT``.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# Bump when the layout changes so cached files are regenerated.
+LAYOUT_VERSION = 1
+
+_styles = getSampleStyleSheet()
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_styles['Heading1'],
+    fontSize=24,
+    textColor=colors.HexColor('#1e293b'),
+    spaceAfter=30,
+    alignment=1,  # Center
+)
+HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_styles['Heading2'],
+    fontSize=14,
+    textColor=colors.HexColor('#1e293b'),
+    spaceAfter=12,
+    spaceBefore=12,
+)
+NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_styles['Normal'],
+    fontSize=11,
+    textColor=colors.HexColor('#475569'),
+    spaceAfter=6,
+)
+FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_styles['Normal'],
+    fontSize=9,
+    textColor=colors.HexColor('#94a3b8'),
+    alignment=1,
+)
+DETAILS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f1f5f9')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1e293b')),
+    ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
+])
+
+
+def cache_dir():
+    return Path(getattr(settings, "INTERVIEW_PDF_CACHE_DIR", settings.BASE_DIR / "cache" / "interview_pdfs"))
+
+
+def invite_fields(application):
+    """Everything printed on the invite, in the form it is printed."""
+    scheduled = application.interview_scheduled_at
+    return {
+        "position": application.job.title,
+        "applicant": application.user.profile.full_name or application.user.username,
+        "date": scheduled.strftime('%B %d, %Y'),
+        "time": scheduled.strftime('%I:%M %p'),
+        "location": application.interview_location or "",
+        "meeting_url": application.interview_meeting_url or "",
+    }
+
+
+def content_hash(fields):
+    payload = json.dumps([LAYOUT_VERSION, fields], sort_keys=True).encode()
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def render_invite(fields, stream):
+    """Write the invitation PDF for ``fields`` to the binary ``stream``."""
+    doc = SimpleDocTemplate(stream, pagesize=letter,
+                            rightMargin=0.5*inch, leftMargin=0.5*inch,
+                            topMargin=0.75*inch, bottomMargin=0.75*inch)
+
+    rows = [
+        ["Position:", fields["position"]],
+        ["Applicant:", fields["applicant"]],
+        ["Date:", fields["date"]],
+        ["Time:", fields["time"]],
+    ]
+    if fields["location"]:
+        rows.append(["Location:", fields["location"]])
+    if fields["meeting_url"]:
+        rows.append(["Meeting URL:", fields["meeting_url"]])
+    details = Table(rows, colWidths=[1.5*inch, 4.5*inch])
+    details.setStyle(DETAILS_TABLE_STYLE)
+
+    if fields["meeting_url"]:
+        preparation = "• Test your internet connection and audio/video before the meeting"
+    else:
+        preparation = "• Bring all necessary documents and references"
+
+    doc.build([
+        Paragraph("Interview Invitation", TITLE_STYLE),
+        Spacer(1, 0.2*inch),
+        Paragraph("Interview Details", HEADING_STYLE),
+        details,
+        Spacer(1, 0.3*inch),
+        Paragraph("Important Information", HEADING_STYLE),
+        Paragraph("• Please arrive 5-10 minutes early", NORMAL_STYLE),
+        Paragraph("• Have a valid ID ready for verification", NORMAL_STYLE),
+        Paragraph(preparation, NORMAL_STYLE),
+        Spacer(1, 0.3*inch),
+        Paragraph("This is an automated invitation. Please confirm your attendance at your earliest convenience.", FOOTER_STYLE),
+    ])
+
+
+def invite_etag(application):
+    return content_hash(invite_fields(application))
+
+
+def cached_invite(application):
+    """Return ``(file, digest)``: the invite PDF opened for reading, rendered if the cache is stale.
+
+    The file is opened here rather than by the caller, so another request
+    deleting it as stale in between cannot turn into a FileNotFoundError;
+    an open handle stays readable after the file is unlinked.
+    """
+    fields = invite_fields(application)
+    digest = content_hash(fields)
+    directory = cache_dir()
+    path = directory / f"{application.id}-{digest}.pdf"
+    try:
+        return open(path, "rb"), digest
+    except FileNotFoundError:
+        pass
+
+    directory.mkdir(parents=True, exist_ok=True)
+    # Render to a temp file and rename, so concurrent requests never see a partial PDF.
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    result = None
+    try:
+        with os.fdopen(fd, "wb") as stream:
+            render_invite(fields, stream)
+        result = open(tmp, "rb")
+        os.replace(tmp, path)
+    except BaseException:
+        if result is not None:
+            result.close()
+        os.unlink(tmp)
+        raise
+    for stale in directory.glob(f"{application.id}-*.pdf"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return result, digest
+
+    directory.mkdir(parents=True, exist_ok=True)
+    # Render to a temp file and rename, so concurrent requests never see a partial PDF.
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as stream:
+            render_invite(fields, stream)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    for stale in directory.glob(f"{application.id}-*.pdf"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    return path, digest
@@ -0,0 +1,218 @@
+"""Sliding-window job popularity ranking.
+
+Applications, saves and job-page views are recorded as weighted events,
+once the surrounding transaction commits (a rolled-back apply is never
+counted). Each worker keeps a per-job score over the last
+``POPULAR_JOBS_WINDOW_SECONDS`` and pushes the top-N list to the
+``popular_jobs`` channel group whenever the ranking changes (at most once
+per ``POPULAR_JOBS_THROTTLE_SECONDS``).
+
+The ranking is approximate and per process: every worker seeds applications
+and saves from the database, but counts views and new events only from the
+requests it handles itself. With several workers, each may broadcast a
+slightly different top-N, and the widget shows whichever one arrived last.
+Page renders (:meth:`PopularityEngine.top_jobs`) use the local process's view.
+"""
+import heapq
+import threading
+import time
+from collections import deque, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import broadcast
+
+GROUP_NAME = "popular_jobs"
+
+EVENT_WEIGHTS = {
+    "view": 1,
+    "save": 3,
+    "apply": 5,
+}
+
+# Event kinds that are also rows in the database and so part of the seed.
+PERSISTED_EVENTS = {"save", "apply"}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class PopularityEngine:
+    """Per-process popularity scores kept in a bounded event window."""
+
+    def __init__(self, window_seconds=None, top_n=None, throttle_seconds=None, max_events=None):
+        self.window_seconds = window_seconds or _setting("POPULAR_JOBS_WINDOW_SECONDS", 24 * 60 * 60)
+        self.top_n = top_n or _setting("POPULAR_JOBS_TOP_N", 5)
+        self.throttle_seconds = throttle_seconds if throttle_seconds is not None else _setting("POPULAR_JOBS_THROTTLE_SECONDS", 5)
+        max_events = max_events or _setting("POPULAR_JOBS_MAX_EVENTS", 50000)
+
+        self._events = deque(maxlen=max_events)
+        self._scores = defaultdict(int)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._published = []
+        self._last_publish = 0.0
+        self._timer = None
+
+    # ---- recording -------------------------------------------------------
+    def record(self, job_id, kind, at=None):
+        """Add one ``kind`` event for ``job_id`` and publish if the top-N moved."""
+        weight = EVENT_WEIGHTS.get(kind)
+        if not weight or not job_id:
+            return
+        seeded = self._ensure_loaded()
+        now = time.time() if at is None else at
+        with self._lock:
+            # A freshly seeded window already contains this row if it came
+            # from the database (applications and saves are post_save events).
+            if not (seeded and kind in PERSISTED_EVENTS):
+                self._push(job_id, weight, now)
+            self._expire(now)
+        self._maybe_publish()
+
+    def _push(self, job_id, weight, ts):
+        if len(self._events) == self._events.maxlen:
+            # The deque is full: account for the event it is about to evict.
+            self._evict(self._events[0])
+        self._events.append((ts, job_id, weight))
+        self._scores[job_id] += weight
+
+    def _evict(self, event):
+        _, job_id, weight = event
+        score = self._scores.get(job_id)
+        if score is None:
+            return
+        if score <= weight:
+            del self._scores[job_id]
+        else:
+            self._scores[job_id] = score - weight
+
+    def _expire(self, now):
+        cutoff = now - self.window_seconds
+        while self._events and self._events[0][0] < cutoff:
+            self._evict(self._events.popleft())
+
+    def _ensure_loaded(self):
+        """Seed the window from the database the first time it is used.
+
+        Returns True if this call performed the seeding.
+        """
+        if self._loaded:
+            return False
+        from .models import JobApplication, SavedJob
+
+        since = timezone.now() - timedelta(seconds=self.window_seconds)
+        rows = []
+        for job_id, applied_at in JobApplication.objects.filter(applied_at__gte=since).values_list("job_id", "applied_at"):
+            rows.append((applied_at.timestamp(), job_id, EVENT_WEIGHTS["apply"]))
+        for job_id, saved_at in SavedJob.objects.filter(saved_at__gte=since).values_list("job_id", "saved_at"):
+            rows.append((saved_at.timestamp(), job_id, EVENT_WEIGHTS["save"]))
+        rows.sort()
+
+        with self._lock:
+            if self._loaded:
+                return False
+            for ts, job_id, weight in rows:
+                self._push(job_id, weight, ts)
+            self._loaded = True
+        return True
+
+    # ---- ranking ---------------------------------------------------------
+    def _ranking(self):
+        return [job_id for job_id, _ in heapq.nlargest(self.top_n, self._scores.items(), key=lambda item: (item[1], item[0]))]
+
+    def top(self):
+        """Return ``[(job_id, score), ...]`` for the current top-N."""
+        self._ensure_loaded()
+        with self._lock:
+            self._expire(time.time())
+            return [(job_id, self._scores[job_id]) for job_id in self._ranking()]
+
+    def top_jobs(self):
+        """Return the top-N ``Job`` objects annotated with ``popularity_score``."""
+        from .models import Job
+
+        ranked = self.top()
+        jobs = Job.objects.filter(id__in=[job_id for job_id, _ in ranked], status="active").in_bulk()
+        result = []
+        for job_id, score in ranked:
+            job = jobs.get(job_id)
+            if job is not None:
+                job.popularity_score = score
+                result.append(job)
+        return result
+
+    # ---- publishing ------------------------------------------------------
+    def _maybe_publish(self):
+        with self._lock:
+            ranking = self._ranking()
+            if ranking == self._published:
+                return
+            wait = self.throttle_seconds - (time.time() - self._last_publish)
+            if wait > 0:
+                # Trailing publish so the last change inside the window is not lost.
+                if self._timer is None:
+                    self._timer = threading.Timer(wait, self._flush_from_timer)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self._flush()
+
+    def _flush_from_timer(self):
+        try:
+            self._flush()
+        finally:
+            # Timer threads are not request threads; release their connection.
+            connection.close()
+
+    def _flush(self):
+        with self._lock:
+            self._timer = None
+            self._expire(time.time())
+            ranking = self._ranking()
+            previous = self._published
+            if ranking == previous:
+                return
+            self._published = ranking
+            self._last_publish = time.time()
+            scores = {job_id: self._scores[job_id] for job_id in ranking}
+
+        publish_ranking(ranking, previous, scores)
+
+
+def publish_ranking(ranking, previous, scores):
+    """Send the new top-N and its diff against ``previous`` to ``popular_jobs``."""
+    from .models import Job
+
+    jobs = Job.objects.filter(id__in=ranking, status="active").in_bulk()
+    payload = [
+        {
+            "id": job_id,
+            "title": jobs[job_id].title,
+            "company_name": jobs[job_id].company_name,
+            "location": jobs[job_id].location,
+            "score": scores.get(job_id, 0),
+        }
+        for job_id in ranking if job_id in jobs
+    ]
+    broadcast.group_send(
+        GROUP_NAME,
+        {
+            "type": "jobs_update",
+            "jobs": payload,
+            "added": [job_id for job_id in ranking if job_id not in previous],
+            "removed": [job_id for job_id in previous if job_id not in ranking],
+        }
+    )
+
+
+engine = PopularityEngine()
+
+
+def record_job_event(job_id, kind):
+    """Count an event towards the ranking once the current transaction commits."""
+    transaction.on_commit(lambda: engine.record(job_id, kind))
@@ -0,0 +1,143 @@
+"""Who is connected to ``ws/notifications/`` right now.
+
+Each open socket is registered under its user id with an expiry that the
+client refreshes by sending ``{"action": "heartbeat"}``. Fan-out code asks
+:func:`is_online` / :func:`online_user_ids` before pushing, so nothing is
+sent to groups without listeners and offline users can be left to the
+deferred (in-app / digest) path instead.
+
+``PRESENCE_BACKEND = "local"`` keeps the registry in process memory, which
+is only correct with a single worker (as with the in-memory channel
+layer). Use ``"redis"`` together with ``PRESENCE_REDIS_URL`` when running
+several Daphne workers.
+
+Keys are user ids for the notification socket; other socket kinds use a
+namespaced string key (see ``main.chat.chat_presence_key``).
+"""
+import threading
+import time
+
+from django.conf import settings
+
+PUSH = "push"
+DIGEST = "digest"
+
+
+def _ttl():
+    return getattr(settings, "PRESENCE_TTL_SECONDS", 90)
+
+
+class LocalPresenceBackend:
+    """In-process registry: ``{user_id: {channel_name: expires_at}}``."""
+
+    def __init__(self):
+        self._sockets = {}
+        self._lock = threading.Lock()
+
+    def touch(self, user_id, channel_name):
+        with self._lock:
+            self._sockets.setdefault(user_id, {})[channel_name] = time.time() + _ttl()
+
+    def remove(self, user_id, channel_name):
+        with self._lock:
+            channels = self._sockets.get(user_id)
+            if channels is None:
+                return
+            channels.pop(channel_name, None)
+            if not channels:
+                del self._sockets[user_id]
+
+    def online(self, user_ids):
+        now = time.time()
+        result = set()
+        with self._lock:
+            for user_id in user_ids:
+                channels = self._sockets.get(user_id)
+                if not channels:
+                    continue
+                for channel_name, expires_at in list(channels.items()):
+                    if expires_at < now:
+                        del channels[channel_name]
+                if channels:
+                    result.add(user_id)
+                else:
+                    del self._sockets[user_id]
+        return result
+
+
+class RedisPresenceBackend:
+    """Shared registry: one sorted set per user, scored by socket expiry."""
+
+    key_prefix = "presence:user:"
+
+    def __init__(self, url):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+
+    def _key(self, user_id):
+        return f"{self.key_prefix}{user_id}"
+
+    def touch(self, user_id, channel_name):
+        ttl = _ttl()
+        key = self._key(user_id)
+        pipe = self._redis.pipeline()
+        pipe.zadd(key, {channel_name: time.time() + ttl})
+        pipe.expire(key, ttl)
+        pipe.execute()
+
+    def remove(self, user_id, channel_name):
+        self._redis.zrem(self._key(user_id), channel_name)
+
+    def online(self, user_ids):
+        user_ids = list(user_ids)
+        if not user_ids:
+            return set()
+        now = time.time()
+        pipe = self._redis.pipeline()
+        for user_id in user_ids:
+            pipe.zcount(self._key(user_id), now, "+inf")
+        counts = pipe.execute()
+        return {user_id for user_id, count in zip(user_ids, counts) if count}
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if getattr(settings, "PRESENCE_BACKEND", "local") == "redis":
+                    _backend = RedisPresenceBackend(settings.PRESENCE_REDIS_URL)
+                else:
+                    _backend = LocalPresenceBackend()
+    return _backend
+
+
+def mark_online(user_id, channel_name):
+    """Register (or refresh) one socket for ``user_id``."""
+    get_backend().touch(user_id, channel_name)
+
+
+heartbeat = mark_online
+
+
+def mark_offline(user_id, channel_name):
+    get_backend().remove(user_id, channel_name)
+
+
+def is_online(user_id):
+    return user_id in get_backend().online([user_id])
+
+
+def online_user_ids(user_ids):
+    """Return the subset of ``user_ids`` with at least one live socket."""
+    return get_backend().online(user_ids)
+
+
+def delivery_mode(user_id):
+    """``PUSH`` when the user has a live socket, otherwise ``DIGEST``."""
+    return PUSH if is_online(user_id) else DIGEST
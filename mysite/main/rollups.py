@@ -0,0 +1,157 @@
+"""Daily rollups behind the admin dashboard charts.
+
+``DailyStat`` holds one row per (metric, day) with the number of source
+rows created that day. :func:`run` is incremental: each metric keeps a
+``StatWatermark`` with the highest source id already counted, and only rows
+above it are aggregated, ``STATS_ROLLUP_BATCH_SIZE`` ids at a time, each batch in
+its own transaction together with the watermark move. The dashboard then
+reads ``days`` rows per metric instead of scanning the fact tables.
+
+Counts are of rows created, so later deletes are not subtracted; run
+``rollup_stats --rebuild`` to recount from what is currently stored.
+Days are UTC dates.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+DEFAULT_BATCH_SIZE = 5000
+CACHE_KEY = "admin:stats:{metric}:{days}"
+TOTALS_CACHE_KEY = "admin:stats:totals"
+
+
+def _metrics():
+    from .models import Job, JobApplication, Message, Notification, User
+
+    # metric -> (source model, creation timestamp field, chart label)
+    return {
+        "signups": (User, "date_joined", "Signups"),
+        "jobs": (Job, "created_at", "Jobs posted"),
+        "applications": (JobApplication, "applied_at", "Applications"),
+        "messages": (Message, "sent_at", "Messages"),
+        "notifications": (Notification, "created_at", "Notifications"),
+    }
+
+
+def metric_labels():
+    return {metric: label for metric, (_, _, label) in _metrics().items()}
+
+
+def _add_counts(metric, counts):
+    from .models import DailyStat
+
+    existing = set(
+        DailyStat.objects.filter(metric=metric, date__in=counts).values_list("date", flat=True)
+    )
+    for day in existing:
+        DailyStat.objects.filter(metric=metric, date=day).update(value=F("value") + counts[day])
+    DailyStat.objects.bulk_create([
+        DailyStat(metric=metric, date=day, value=value)
+        for day, value in counts.items() if day not in existing
+    ])
+
+
+def _roll_metric(metric, model, field, batch_size):
+    from .models import StatWatermark
+
+    processed = 0
+    while True:
+        with transaction.atomic():
+            watermark, _ = StatWatermark.objects.select_for_update().get_or_create(metric=metric)
+            ids = list(
+                model._base_manager.filter(pk__gt=watermark.last_id)
+                .order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return processed
+            rows = (
+                model._base_manager.filter(pk__gt=watermark.last_id, pk__lte=ids[-1])
+                .annotate(day=TruncDate(field, tzinfo=datetime.timezone.utc))
+                .values("day").annotate(n=Count("pk")).values_list("day", "n")
+            )
+            _add_counts(metric, dict(rows))
+            watermark.last_id = ids[-1]
+            watermark.save(update_fields=["last_id", "updated_at"])
+        processed += len(ids)
+
+
+def run(batch_size=None, log=None):
+    """Fold new source rows into DailyStat; return ``{metric: rows processed}``."""
+    batch_size = batch_size or getattr(settings, "STATS_ROLLUP_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    processed = {}
+    for metric, (model, field, _) in _metrics().items():
+        processed[metric] = _roll_metric(metric, model, field, batch_size)
+        if log:
+            log(f"{metric}: {processed[metric]}")
+    invalidate_cache()
+    return processed
+
+
+def reset():
+    """Drop all rollups and watermarks so the next :func:`run` recounts everything."""
+    from .models import DailyStat, StatWatermark
+
+    with transaction.atomic():
+        DailyStat.objects.all().delete()
+        StatWatermark.objects.all().delete()
+
+
+def invalidate_cache():
+    cache.delete_many([TOTALS_CACHE_KEY] + [
+        CACHE_KEY.format(metric=metric, days=days)
+        for metric in _metrics() for days in (7, 30, 90)
+    ])
+
+
+def _cache_seconds():
+    return getattr(settings, "STATS_CACHE_SECONDS", 300)
+
+
+def totals():
+    """Current user and job counts, cached for ``STATS_CACHE_SECONDS``."""
+    from .models import Job, User
+
+    return cache.get_or_set(TOTALS_CACHE_KEY, lambda: {
+        "users": User.objects.count(),
+        "jobs": Job.objects.count(),
+    }, _cache_seconds())
+
+
+def series(metric, days=30):
+    """Return ``[(date, value), ...]`` for the last ``days`` UTC days, zero-filled."""
+    from .models import DailyStat
+
+    key = CACHE_KEY.format(metric=metric, days=days)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    today = timezone.now().astimezone(datetime.timezone.utc).date()
+    start = today - datetime.timedelta(days=days - 1)
+    stored = dict(
+        DailyStat.objects.filter(metric=metric, date__gte=start, date__lte=today).values_list("date", "value")
+    )
+    result = [
+        (day, stored.get(day, 0))
+        for day in (start + datetime.timedelta(days=offset) for offset in range(days))
+    ]
+    cache.set(key, result, _cache_seconds())
+    return result
+
+
+def dashboard_charts(days=30):
+    """Chart data for the admin dashboard: shared labels plus one dataset per metric."""
+    labels = None
+    datasets = []
+    for metric, label in metric_labels().items():
+        points = series(metric, days)
+        if labels is None:
+            labels = [day.strftime("%b %d") for day, _ in points]
+        values = [value for _, value in points]
+        datasets.append({"metric": metric, "label": label, "data": values, "total": sum(values)})
+    return {"labels": labels or [], "datasets": datasets, "days": days}
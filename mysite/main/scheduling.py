@@ -0,0 +1,346 @@
+"""Batch interview scheduling.
+
+:func:`plan` assigns interview slots to a batch of applications inside the
+employer's availability windows. Busy time is kept in interval trees (one
+for the employer, one per applicant) built from existing
+``interview_scheduled_at`` + ``interview_duration_minutes``, so each
+candidate slot is checked in O(log n) rather than against every interview.
+Applications are placed greedily, in the order given, at the earliest free
+slot on a ``SLOT_STEP_MINUTES`` grid; each placement becomes busy time for
+the ones after it.
+
+:func:`commit` writes a plan in one transaction. It first locks the
+employer's and applicants' user rows (:func:`lock_calendars`, which single
+scheduling takes too) and re-checks every slot, dropping any that was booked
+since the plan was made. Then ``bulk_update`` for the applications,
+``bulk_create`` for the notifications (pushed explicitly, since bulk_create
+sends no post_save) and invite emails queued with ``on_commit`` so nothing
+is sent if the transaction rolls back.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from . import analytics, ics
+
+SLOT_STEP_MINUTES = 15
+DEFAULT_DURATION_MINUTES = 45
+MAX_DURATION_MINUTES = 8 * 60
+
+
+# ---- interval tree ----------------------------------------------------------
+
+class _Node:
+    __slots__ = ("start", "end", "item", "priority", "left", "right", "max_end")
+
+    def __init__(self, start, end, item):
+        self.start, self.end, self.item = start, end, item
+        self.priority = random.random()
+        self.left = self.right = None
+        self.max_end = end
+
+
+def _max_end(node):
+    return node.max_end if node else None
+
+
+def _update(node):
+    node.max_end = max(e for e in (node.end, _max_end(node.left), _max_end(node.right)) if e is not None)
+    return node
+
+
+def _rotate_right(node):
+    child = node.left
+    node.left, child.right = child.right, node
+    _update(node)
+    return _update(child)
+
+
+def _rotate_left(node):
+    child = node.right
+    node.right, child.left = child.left, node
+    _update(node)
+    return _update(child)
+
+
+class IntervalTree:
+    """Half-open ``[start, end)`` intervals in a treap keyed by start, augmented with max end."""
+
+    def __init__(self, intervals=()):
+        self._root = None
+        self._size = 0
+        for start, end, item in intervals:
+            self.add(start, end, item)
+
+    def __len__(self):
+        return self._size
+
+    def add(self, start, end, item=None):
+        self._root = self._insert(self._root, _Node(start, end, item))
+        self._size += 1
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if new.start < node.start:
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                node = _rotate_right(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                node = _rotate_left(node)
+        return _update(node)
+
+    def overlapping(self, start, end):
+        """Return the items of every interval overlapping ``[start, end)``."""
+        found, stack = [], [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= start:
+                continue  # nothing in this subtree ends after ``start``
+            stack.append(node.left)
+            if node.start < end:
+                if node.end > start:
+                    found.append(node.item)
+                stack.append(node.right)
+        return found
+
+    def overlaps(self, start, end):
+        return bool(self.overlapping(start, end))
+
+
+# ---- planning ---------------------------------------------------------------
+
+def parse_duration(value, default=DEFAULT_DURATION_MINUTES):
+    """Interview length in minutes from form input, kept within 5 minutes .. 8 hours."""
+    try:
+        minutes = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(minutes, 5), MAX_DURATION_MINUTES)
+
+
+def _busy(queryset):
+    for pk, start, minutes in queryset.filter(interview_scheduled_at__isnull=False).values_list(
+        "pk", "interview_scheduled_at", "interview_duration_minutes"
+    ):
+        yield start, start + timedelta(minutes=minutes), pk
+
+
+def employer_busy_tree(employer, exclude_ids=()):
+    from .models import JobApplication
+
+    return IntervalTree(_busy(JobApplication.objects.filter(job__user=employer).exclude(pk__in=exclude_ids)))
+
+
+def applicant_busy_trees(user_ids, exclude_ids=()):
+    from .models import JobApplication
+
+    trees = {user_id: IntervalTree() for user_id in user_ids}
+    rows = JobApplication.objects.filter(user_id__in=user_ids).exclude(pk__in=exclude_ids)
+    for user_id, start, minutes in rows.filter(interview_scheduled_at__isnull=False).values_list(
+        "user_id", "interview_scheduled_at", "interview_duration_minutes"
+    ):
+        trees[user_id].add(start, start + timedelta(minutes=minutes))
+    return trees
+
+
+def conflicts(employer, start, duration_minutes, exclude_id=None):
+    """Ids of the employer's interviews overlapping a proposed slot (single scheduling)."""
+    tree = employer_busy_tree(employer, exclude_ids=[exclude_id] if exclude_id else ())
+    return tree.overlapping(start, start + timedelta(minutes=duration_minutes))
+
+
+@dataclass
+class Plan:
+    duration_minutes: int
+    buffer_minutes: int = 0
+    assigned: list = field(default_factory=list)     # [(application, start)]
+    unassigned: list = field(default_factory=list)   # [application]
+
+
+def _candidate_starts(windows, duration, step, not_before):
+    for window_start, window_end in sorted(windows):
+        start = max(window_start, not_before)
+        if start > window_start:
+            # Stay on the window's grid
+            steps = -(-(start - window_start) // step)
+            start = window_start + steps * step
+        while start + duration <= window_end:
+            yield start
+            start += step
+
+
+def plan(employer, applications, windows, duration_minutes=45, buffer_minutes=0, step_minutes=SLOT_STEP_MINUTES):
+    """Greedily place ``applications`` in ``windows`` (aware ``(start, end)`` pairs).
+
+    Neither the employer nor an applicant is double-booked, and every new
+    interview keeps ``buffer_minutes`` clear on either side. Nothing is saved.
+    """
+    applications = list(applications)
+    ids = [application.pk for application in applications]
+    duration = timedelta(minutes=duration_minutes)
+    buffer = timedelta(minutes=buffer_minutes)
+    step = timedelta(minutes=step_minutes)
+    employer_tree = employer_busy_tree(employer, exclude_ids=ids)
+    applicant_trees = applicant_busy_trees({application.user_id for application in applications}, exclude_ids=ids)
+    candidates = list(_candidate_starts(windows, duration, step, timezone.now()))
+
+    result = Plan(duration_minutes=duration_minutes, buffer_minutes=buffer_minutes)
+    for application in applications:
+        applicant_tree = applicant_trees[application.user_id]
+        for start in candidates:
+            end = start + duration
+            # The buffer must be clear on both sides of the new interview.
+            if employer_tree.overlaps(start - buffer, end + buffer) or applicant_tree.overlaps(start - buffer, end + buffer):
+                continue
+            employer_tree.add(start, end, application.pk)
+            applicant_tree.add(start, end, application.pk)
+            result.assigned.append((application, start))
+            break
+        else:
+            result.unassigned.append(application)
+    return result
+
+
+# ---- persisting -------------------------------------------------------------
+
+def lock_calendars(user_ids):
+    """Lock the users whose interviews are about to change, in a fixed order.
+
+    Every writer of interview slots takes these locks first, so a conflict
+    check made after them cannot be invalidated before the transaction ends.
+    """
+    from django.contrib.auth import get_user_model
+
+    list(get_user_model().objects.select_for_update().filter(pk__in=set(user_ids)).order_by("pk").values_list("pk"))
+
+
+def invite_email(application, connection=None):
+    """The interview invite email for a scheduled application, with an ICS attachment."""
+    start = application.interview_scheduled_at
+    ics_body, _ = ics.invite(application, method="REQUEST")
+
+    subject = f"Interview Scheduled: {application.job.title}"
+    body = (
+        f"Hi {application.user.first_name or application.user.username},\n\n"
+        f"Your interview for '{application.job.title}' has been scheduled.\n"
+        f"When: {start.strftime('%b %d, %Y %I:%M %p %Z')}\n"
+        f"Where: {application.interview_location or 'Online'}\n"
+        f"Meeting: {application.interview_meeting_url or 'N/A'}\n\n"
+        "An event invite is attached."
+    )
+    email = EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [application.user.email], connection=connection)
+    email.attach(filename=f"interview-{application.id}.ics", content=ics_body, mimetype='text/calendar')
+    return email
+
+
+def send_invites(applications):
+    """Send the invites over one SMTP connection; failures are dropped like single invites."""
+    emails = [invite_email(application) for application in applications if application.user.email]
+    if not emails:
+        return 0
+    try:
+        return get_connection(fail_silently=True).send_messages(emails) or 0
+    except Exception:
+        return 0
+
+
+def commit(plan_, employer, location=None, meeting_url=None):
+    """Persist an assignment plan; return the number of applications scheduled."""
+    from .models import JobApplication, Notification
+    from .signals import push_notification
+
+    if not plan_.assigned:
+        return 0
+    with transaction.atomic():
+        lock_calendars([employer.pk] + [application.user_id for application, _ in plan_.assigned])
+        # Lock the rows and re-read them so concurrent edits are not overwritten.
+        locked = JobApplication.objects.select_for_update(of=("self",)).select_related("job__user", "user__profile").in_bulk(
+            [application.pk for application, _ in plan_.assigned]
+        )
+
+        # The plan was made before the locks: check each slot again against
+        # what is booked now and drop the ones that have since been taken.
+        ids = list(locked)
+        duration = timedelta(minutes=plan_.duration_minutes)
+        buffer = timedelta(minutes=plan_.buffer_minutes)
+        employer_tree = employer_busy_tree(employer, exclude_ids=ids)
+        applicant_trees = applicant_busy_trees({application.user_id for application in locked.values()}, exclude_ids=ids)
+        starts, assigned = {}, []
+        for planned, start in plan_.assigned:
+            application = locked.get(planned.pk)
+            if application is None or application.job.user_id != employer.pk:
+                continue
+            end = start + duration
+            applicant_tree = applicant_trees[application.user_id]
+            if employer_tree.overlaps(start - buffer, end + buffer) or applicant_tree.overlaps(start - buffer, end + buffer):
+                plan_.unassigned.append(planned)
+                continue
+            employer_tree.add(start, end, application.pk)
+            applicant_tree.add(start, end, application.pk)
+            starts[application.pk] = start
+            assigned.append((planned, start))
+        plan_.assigned = assigned
+        applications = [locked[pk] for pk in starts]
+        previous_status = {application.pk: application.status for application in applications}
+        now = timezone.now()
+        for application in applications:
+            application.interview_scheduled_at = starts[application.pk]
+            application.interview_duration_minutes = plan_.duration_minutes
+            application.interview_location = location or None
+            application.interview_meeting_url = meeting_url or None
+            application.status = 'Interview'
+            # bulk_update skips post_save, so revise the calendar events here
+            if application._interview_state != ics.interview_state(application):
+                application.interview_sequence += 1
+                application.interview_updated_at = now
+        JobApplication.objects.bulk_update(applications, [
+            "interview_scheduled_at", "interview_duration_minutes",
+            "interview_location", "interview_meeting_url", "status",
+            "interview_sequence", "interview_updated_at",
+        ])
+        if applications:
+            ics.invalidate_feeds([employer.pk] + [application.user_id for application in applications])
+
+        # bulk_update sends no post_save: keep the job funnel counters in step.
+        for application in applications:
+            if previous_status[application.pk] != application.status:
+                analytics.status_changed(application, previous_status[application.pk])
+
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                user=application.user,
+                notification_type='system',
+                title='Interview Scheduled',
+                message=f'Interview scheduled for {application.job.title}',
+                link='/interviews/',
+                related_user=employer,
+            )
+            for application in applications
+        ])
+        for notification in notifications:
+            push_notification(notification)
+
+        transaction.on_commit(lambda: send_invites(applications))
+    return len(applications)
+
+
+def parse_windows(dates, starts, ends):
+    """Turn parallel lists of form values (YYYY-MM-DD, HH:MM, HH:MM) into aware windows."""
+    windows = []
+    tz = timezone.get_current_timezone()
+    for day, start, end in zip(dates, starts, ends):
+        if not (day and start and end):
+            continue
+        window_start = timezone.make_aware(datetime.strptime(f"{day}T{start}", "%Y-%m-%dT%H:%M"), tz)
+        window_end = timezone.make_aware(datetime.strptime(f"{day}T{end}", "%Y-%m-%dT%H:%M"), tz)
+        if window_end > window_start:
+            windows.append((window_start, window_end))
+    return windows
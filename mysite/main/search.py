@@ -0,0 +1,194 @@
+"""Message full-text search.
+
+On SQLite the ``main_message_fts`` FTS5 table mirrors every non-deleted
+message's content plus its two participants as ``u<id>`` tokens, and is
+kept in sync by triggers on ``main_message`` (create, edit, soft-delete,
+hard delete). A search matches the user token and the query terms in one
+FTS lookup, so its cost depends on the user's own messages rather than
+on the size of the ``Message`` table. Results are ranked with bm25 and
+carry a highlighted snippet.
+
+Other backends fall back to ``content__icontains`` (backed by a pg_trgm
+GIN index on PostgreSQL, see migration 0008).
+"""
+import re
+
+from django.db import connection
+from django.utils.html import escape
+
+FTS_TABLE = "main_message_fts"
+
+# Control characters never typed into a message; swapped for <mark> after escaping.
+_MARK_OPEN = "\x02"
+_MARK_CLOSE = "\x03"
+
+_SQLITE_TRIGGERS = {
+    "main_message_fts_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS main_message_fts_insert AFTER INSERT ON main_message
+        WHEN new.is_deleted = 0
+        BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, content, participants)
+            VALUES (new.id, new.content, 'u' || new.sender_id || ' u' || new.receiver_id);
+        END
+    """,
+    "main_message_fts_delete": f"""
+        CREATE TRIGGER IF NOT EXISTS main_message_fts_delete AFTER DELETE ON main_message
+        BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        END
+    """,
+    "main_message_fts_update": f"""
+        CREATE TRIGGER IF NOT EXISTS main_message_fts_update AFTER UPDATE OF content, is_deleted ON main_message
+        BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+            INSERT INTO {FTS_TABLE}(rowid, content, participants)
+            SELECT new.id, new.content, 'u' || new.sender_id || ' u' || new.receiver_id
+            WHERE new.is_deleted = 0;
+        END
+    """,
+}
+
+_available = None
+
+
+def install_sqlite_index(conn):
+    """Create the FTS table and triggers if missing; rebuild if any were missing.
+
+    Safe to call repeatedly. Triggers disappear when a migration rebuilds
+    ``main_message`` (SQLite ALTERs copy the table), so this also runs after
+    every ``migrate`` to heal the index.
+    """
+    global _available
+    if conn.vendor != "sqlite":
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE 'main_message_fts%%'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if "main_message" not in conn.introspection.table_names(cursor):
+            return False
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            "USING fts5(content, participants, tokenize='unicode61 remove_diacritics 2')"
+        )
+        for sql in _SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+
+        if FTS_TABLE not in existing or not set(_SQLITE_TRIGGERS) <= existing:
+            rebuild_sqlite_index(cursor)
+    _available = True
+    return True
+
+
+def drop_sqlite_index(conn):
+    global _available
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        for name in _SQLITE_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    _available = False
+
+
+def rebuild_sqlite_index(cursor):
+    cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    cursor.execute(
+        f"INSERT INTO {FTS_TABLE}(rowid, content, participants) "
+        "SELECT id, content, 'u' || sender_id || ' u' || receiver_id FROM main_message WHERE is_deleted = 0"
+    )
+
+
+def fts_table_exists(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def fts_available():
+    global _available
+    if _available is None:
+        _available = connection.vendor == "sqlite" and fts_table_exists(connection)
+    return _available
+
+
+def _fts_query(user_id, query):
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    # Quote every term (neutralises FTS syntax) and prefix-match it.
+    content = " AND ".join(f'"{term}"*' for term in terms)
+    return f'participants : "u{int(user_id)}" AND content : ({content})'
+
+
+def _highlight(text):
+    return escape(text).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def _python_snippet(content, query, width=80):
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return escape(content[:width])
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    match = pattern.search(content)
+    start = max(0, (match.start() if match else 0) - width // 2)
+    window = content[start:start + width]
+    marked = pattern.sub(lambda m: f"{_MARK_OPEN}{m.group(0)}{_MARK_CLOSE}", window)
+    prefix = "…" if start else ""
+    suffix = "…" if start + width < len(content) else ""
+    return prefix + _highlight(marked) + suffix
+
+
+def search_messages(user, query, limit=20, applicants_only=False):
+    """Return ``[(message, snippet_html), ...]`` for ``user``'s messages matching ``query``.
+
+    With ``applicants_only`` the other participant must have applied to one
+    of ``user``'s jobs (employer inbox search).
+    """
+    from .models import Message
+
+    if fts_available():
+        match = _fts_query(user.id, query)
+        if match is None:
+            return []
+        sql = f"""
+            SELECT m.id, snippet({FTS_TABLE}, 0, %s, %s, '…', 16)
+            FROM {FTS_TABLE} JOIN main_message m ON m.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s
+        """
+        params = [_MARK_OPEN, _MARK_CLOSE, match]
+        if applicants_only:
+            sql += """
+              AND EXISTS (
+                SELECT 1 FROM main_jobapplication ja JOIN main_job j ON j.id = ja.job_id
+                WHERE j.user_id = %s
+                  AND ja.user_id = CASE WHEN m.sender_id = %s THEN m.receiver_id ELSE m.sender_id END
+              )
+            """
+            params += [user.id, user.id]
+        sql += f" ORDER BY bm25({FTS_TABLE}) LIMIT %s"
+        params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            hits = cursor.fetchall()
+        messages = Message.objects.select_related(
+            'sender', 'receiver', 'sender__profile', 'receiver__profile'
+        ).in_bulk([message_id for message_id, _ in hits])
+        return [(messages[message_id], _highlight(snippet)) for message_id, snippet in hits if message_id in messages]
+
+    from django.db.models import Q
+
+    queryset = Message.objects.filter(
+        Q(sender=user) | Q(receiver=user),
+        content__icontains=query,
+        is_deleted=False
+    )
+    if applicants_only:
+        from .models import JobApplication
+        applicant_ids = JobApplication.objects.filter(job__user=user).values('user_id')
+        queryset = queryset.filter(Q(sender=user, receiver_id__in=applicant_ids) | Q(sender_id__in=applicant_ids, receiver=user))
+    queryset = queryset.select_related('sender', 'receiver', 'sender__profile', 'receiver__profile').order_by('-sent_at')[:limit]
+    return [(message, _python_snippet(message.content, query)) for message in queryset]
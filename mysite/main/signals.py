@@ -1,9 +1,15 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, post_migrate, pre_save
 from django.contrib.auth.models import User
+from django.conf import settings
 from django.dispatch import receiver
-from .models import Profile, Notification, GlobalNotification
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+from .models import Profile, Notification, GlobalNotification, JobApplication, SavedJob, Message, Job, Skill
+from .popularity import record_job_event
+from . import analytics, broadcast, contacts, ics, matching, presence, search, unread
+
+try:
+    import ujson as fast_json
+except ImportError:  # pragma: no cover - ujson is listed in requirements.txt
+    import json as fast_json
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -15,55 +21,224 @@ def save_user_profile(sender, instance, **kwargs):
     instance.profile.save()
 
 
-@receiver(post_save, sender=Notification)
-def broadcast_notification(sender, instance, created, **kwargs):
-    """Broadcast new notifications to user via WebSocket"""
-    if created:
-        print(f"📨 Broadcasting notification {instance.id} to user {instance.user.id}")
-        channel_layer = get_channel_layer()
-        
+def push_notification(notification):
+    """Broadcast a notification to its user via WebSocket once the row is committed.
+
+    Users without a live socket get no frame. The notification is marked for
+    the next email digest instead (``manage.py send_notification_digests``),
+    so only offline users are emailed. Call this directly for rows created
+    with ``bulk_create``, which sends no post_save.
+    """
+    if presence.delivery_mode(notification.user_id) == presence.DIGEST:
+        Notification.objects.filter(pk=notification.pk).update(digest_pending=True)
+        notification.digest_pending = True
+    else:
         # Send notification to user-specific group
-        async_to_sync(channel_layer.group_send)(
-            f"user_{instance.user.id}_notifications",
+        broadcast.group_send(
+            f"user_{notification.user_id}_notifications",
             {
                 "type": "notification_message",
                 "notification": {
-                    "id": instance.id,
-                    "title": instance.title,
-                    "message": instance.message,
-                    "notification_type": instance.notification_type,
-                    "is_read": instance.is_read,
-                    "link": instance.link,
-                    "created_at": instance.created_at.isoformat(),
+                    "id": notification.id,
+                    "title": notification.title,
+                    "message": notification.message,
+                    "notification_type": notification.notification_type,
+                    "is_read": notification.is_read,
+                    "link": notification.link,
+                    "created_at": notification.created_at.isoformat(),
                 }
             }
         )
-        print(f"✅ Notification {instance.id} broadcasted successfully")
+
+
+@receiver(post_save, sender=Notification)
+def broadcast_notification(sender, instance, created, **kwargs):
+    """Broadcast new notifications to user via WebSocket once the row is committed."""
+    if created:
+        push_notification(instance)
 
 
 @receiver(post_save, sender=GlobalNotification)
 def broadcast_global_notification(sender, instance, created, **kwargs):
-    """Broadcast new global notifications to all connected users"""
+    """Broadcast new global notifications to all connected users.
+
+    The WebSocket frame is encoded once here and every consumer in the
+    group forwards the same text verbatim, instead of each connection
+    re-running json.dumps on an identical payload.
+    """
     if created and instance.is_active and instance.show_on_site:
-        channel_layer = get_channel_layer()
-        
-        # Send notification to global group
-        async_to_sync(channel_layer.group_send)(
+        text = fast_json.dumps({
+            "type": "global_notification",
+            "notification": {
+                "id": instance.id,
+                "title": instance.title,
+                "message": instance.message,
+                "level": instance.level,
+                "created_at": instance.created_at.isoformat(),
+            }
+        })
+
+        # Send pre-serialized frame to global group
+        broadcast.group_send(
             "global_notifications",
             {
                 "type": "global_notification_message",
-                "notification": {
-                    "id": instance.id,
-                    "title": instance.title,
-                    "message": instance.message,
-                    "level": instance.level,
-                    "created_at": instance.created_at.isoformat(),
-                }
+                "text": text,
             }
         )
 
 
+@receiver(post_save, sender=JobApplication)
+def track_application_popularity(sender, instance, created, **kwargs):
+    """Count new applications towards the job's popularity score"""
+    if created:
+        record_job_event(instance.job_id, "apply")
+
+
+@receiver(post_save, sender=SavedJob)
+def track_saved_job_popularity(sender, instance, created, **kwargs):
+    """Count saves towards the job's popularity score"""
+    if created:
+        record_job_event(instance.job_id, "save")
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_application_status(sender, instance, **kwargs):
+    """Keep the loaded status so post_save can tell what changed (skipped if deferred)"""
+    instance._analytics_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=JobApplication)
+def track_application_analytics(sender, instance, created, **kwargs):
+    """Keep the job's funnel counters in step with new applications and status changes"""
+    if created:
+        analytics.application_created(instance)
+    elif instance._analytics_status is not None and instance._analytics_status != instance.status:
+        analytics.status_changed(instance, instance._analytics_status)
+    instance._analytics_status = instance.status
+
+
+@receiver(post_init, sender=JobApplication)
+def remember_interview_state(sender, instance, **kwargs):
+    instance._interview_state = ics.interview_state(instance)
+
+
+@receiver(post_save, sender=JobApplication)
+def track_interview_changes(sender, instance, created, **kwargs):
+    """Revise the calendar event (SEQUENCE) and refresh both parties' feeds"""
+    state = ics.interview_state(instance)
+    if created:
+        changed = instance.interview_scheduled_at is not None
+    else:
+        previous = instance._interview_state
+        # Status changes of never-scheduled applications have no event to revise.
+        changed = (
+            previous is not None and state is not None and previous != state
+            and (previous[0] is not None or state[0] is not None)
+        )
+    if changed:
+        ics.interview_changed(instance)
+    instance._interview_state = state
+
+
+@receiver(post_save, sender=Job)
+def refresh_job_calendar_feeds(sender, instance, created, **kwargs):
+    if not created:
+        ics.invalidate_job_feeds([instance.pk])
+
+
+@receiver(post_init, sender=Profile)
+def remember_profile_calendar_name(sender, instance, **kwargs):
+    instance._calendar_name = instance.__dict__.get("full_name")
+
+
+@receiver(post_save, sender=Profile)
+def refresh_profile_calendar_feeds(sender, instance, created, **kwargs):
+    """The applicant's name is written into their interview events"""
+    if not created and "full_name" in instance.__dict__ and instance._calendar_name != instance.full_name:
+        ics.invalidate_user_feeds(instance.user_id)
+    instance._calendar_name = instance.__dict__.get("full_name")
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_user_calendar_identity(sender, instance, **kwargs):
+    instance._calendar_identity = (instance.__dict__.get("username"), instance.__dict__.get("email"))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_user_calendar_feeds(sender, instance, created, **kwargs):
+    """Usernames and emails appear as attendee/organizer in interview events"""
+    identity = (instance.__dict__.get("username"), instance.__dict__.get("email"))
+    if not created and None not in instance._calendar_identity and identity != instance._calendar_identity:
+        ics.invalidate_user_feeds(instance.pk)
+    instance._calendar_identity = identity
+
+
+@receiver(post_save, sender=SavedJob)
+def track_saved_job_analytics(sender, instance, created, **kwargs):
+    if created:
+        analytics.record_save(instance.job_id)
+
+
+@receiver(pre_save, sender=JobApplication)
+def score_new_application(sender, instance, **kwargs):
+    """Store the applicant's skill match against the employer's desired skills"""
+    if instance._state.adding:
+        matching.apply_score(instance)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def refresh_applicant_matches(sender, instance, **kwargs):
+    """A seeker's skills changed: rescore their applications"""
+    if instance.user_id:
+        user_id = Profile.objects.filter(pk=instance.user_id).values_list("user_id", flat=True).first()
+        if user_id:
+            matching.refresh_for_applicant(user_id)
+
+
+@receiver(m2m_changed, sender=Profile.desired_skills.through)
+def refresh_employer_matches(sender, instance, action, reverse, pk_set, **kwargs):
+    """An employer's desired skills changed: rescore applications to their jobs"""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        employer_ids = [instance.user_id]
+    elif pk_set:
+        employer_ids = Profile.objects.filter(pk__in=pk_set).values_list("user_id", flat=True)
+    else:
+        return  # reverse clear: the affected profiles are no longer known
+    for employer_id in employer_ids:
+        matching.refresh_for_employer(employer_id)
+
+
+
+@receiver(post_save, sender=Message)
+def invalidate_message_contacts(sender, instance, created, **kwargs):
+    """New, edited or soft-deleted messages change both participants' sidebars"""
+    if created:
+        unread.message_sent(instance)
+    contacts.invalidate(instance.sender_id, instance.receiver_id)
+
+
+@receiver(post_save, sender=JobApplication)
+def invalidate_application_contacts(sender, instance, **kwargs):
+    """Applications add a contact for the applicant and the employer"""
+    employer_id = Job.objects.filter(id=instance.job_id).values_list("user_id", flat=True).first()
+    contacts.invalidate(instance.user_id, employer_id)
+
 # @receiver(post_save, sender=User)
 # def create_user_profile(sender, instance, created, **kwargs):
 #     if created:
-#         UserProfile.objects.create(user=instance)
\ No newline at end of file
+#         UserProfile.objects.create(user=instance)
+
+@receiver(post_migrate)
+def heal_message_search_index(sender, using="default", **kwargs):
+    """Reinstall the message FTS triggers after migrations that rebuilt main_message."""
+    if sender.name != "main":
+        return
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor == "sqlite" and search.fts_table_exists(connection):
+        search.install_sqlite_index(connection)
@@ -0,0 +1,122 @@
+"""Test runner that brings up a throwaway PostgreSQL cluster when it can.
+
+``python manage.py test`` normally runs against whatever ``DATABASES``
+says. When that is SQLite and a local PostgreSQL installation is found
+(``initdb`` and ``pg_ctl`` on ``PATH`` or in ``PG_BIN``, and psycopg
+importable), the runner creates a cluster in a temporary directory,
+listens on a Unix socket only, runs the suite against it and deletes it
+afterwards, so tests exercise the production backend without Docker or a
+shared server. Set ``TEST_DB=sqlite`` to skip this.
+
+The runner also switches the audit log to synchronous writes.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+
+def _pg_tool(name):
+    bin_dir = os.environ.get("PG_BIN")
+    if bin_dir and (Path(bin_dir) / name).exists():
+        return str(Path(bin_dir) / name)
+    return shutil.which(name)
+
+
+def temp_postgres_available():
+    if os.environ.get("TEST_DB", "").lower() == "sqlite":
+        return False
+    if settings.DATABASES["default"]["ENGINE"] != "django.db.backends.sqlite3":
+        return False
+    try:
+        import psycopg  # noqa: F401
+    except ImportError:
+        return False
+    return bool(_pg_tool("initdb") and _pg_tool("pg_ctl"))
+
+
+class TemporaryPostgres:
+    """An initdb'd cluster in a temp dir, reachable only through its socket directory."""
+
+    def __init__(self):
+        self.root = Path(tempfile.mkdtemp(prefix="mysite-pg-"))
+        self.data = self.root / "data"
+        self.socket_dir = self.root / "sock"
+
+    def start(self):
+        self.socket_dir.mkdir()
+        subprocess.run(
+            [_pg_tool("initdb"), "-D", str(self.data), "-U", "postgres", "-A", "trust", "--no-sync"],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+        subprocess.run(
+            [_pg_tool("pg_ctl"), "-D", str(self.data), "-w", "-l", str(self.root / "server.log"),
+             "-o", f"-k {self.socket_dir} -c listen_addresses='' -c fsync=off -c full_page_writes=off",
+             "start"],
+            check=True, stdout=subprocess.DEVNULL,
+        )
+
+    def stop(self):
+        try:
+            subprocess.run(
+                [_pg_tool("pg_ctl"), "-D", str(self.data), "-m", "fast", "-w", "stop"],
+                check=False, stdout=subprocess.DEVNULL,
+            )
+        finally:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def database_settings(self):
+        return {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": "postgres",
+            "USER": "postgres",
+            "PASSWORD": "",
+            "HOST": str(self.socket_dir),
+            "PORT": "",
+        }
+
+
+def _switch_default_database(config):
+    if "default" in connections:
+        connections["default"].close()
+    settings.DATABASES["default"] = config
+    # Rebuild the handler's normalised settings and drop the cached connection.
+    connections.__dict__.pop("settings", None)
+    try:
+        del connections["default"]
+    except AttributeError:
+        pass
+
+
+class TempPostgresTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # Tests read audit entries straight after the request that wrote them.
+        settings.AUDIT_LOG_SYNC = True
+
+    def setup_databases(self, **kwargs):
+        self._temp_postgres = None
+        if temp_postgres_available():
+            self._temp_postgres = TemporaryPostgres()
+            self._temp_postgres.start()
+            self._original_database = settings.DATABASES["default"]
+            _switch_default_database(self._temp_postgres.database_settings())
+            if self.verbosity:
+                print(f"Using temporary PostgreSQL cluster in {self._temp_postgres.root}")
+        elif self.verbosity:
+            print("Using SQLite for tests")
+        return super().setup_databases(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        try:
+            super().teardown_databases(old_config, **kwargs)
+        finally:
+            if self._temp_postgres is not None:
+                connections.close_all()
+                self._temp_postgres.stop()
+                _switch_default_database(self._original_database)
@@ -0,0 +1,108 @@
+"""Denormalised unread-message counters.
+
+``ConversationUnread`` holds one row per (reader, sender) pair and
+``Profile.unread_messages_count`` the reader's total, so unread badges are
+a single-row read instead of a ``COUNT(*)`` over ``Message``. Both are
+adjusted with ``F()`` expressions in the same transaction as the message
+write. Only live (not soft-deleted) unread messages are counted.
+
+``python manage.py reconcile_unread_counts`` rebuilds both from
+``Message`` if they ever drift (hard deletes, manual SQL, ...).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest
+
+from . import contacts
+
+
+def _adjust(user_id, other_id, delta):
+    from .models import ConversationUnread, Profile
+
+    with transaction.atomic():
+        updated = ConversationUnread.objects.filter(user_id=user_id, other_user_id=other_id).update(
+            count=Greatest(F('count') + delta, 0)
+        )
+        if not updated and delta > 0:
+            try:
+                with transaction.atomic():
+                    ConversationUnread.objects.create(user_id=user_id, other_user_id=other_id, count=delta)
+            except IntegrityError:
+                # Created concurrently by another writer
+                ConversationUnread.objects.filter(user_id=user_id, other_user_id=other_id).update(
+                    count=F('count') + delta
+                )
+        Profile.objects.filter(user_id=user_id).update(
+            unread_messages_count=Greatest(F('unread_messages_count') + delta, 0)
+        )
+
+
+def message_sent(message):
+    """Count a newly created message against its receiver"""
+    if not message.is_read and not message.is_deleted:
+        _adjust(message.receiver_id, message.sender_id, 1)
+
+
+def message_removed(message):
+    """Uncount an unread message that was just soft-deleted"""
+    if not message.is_read:
+        _adjust(message.receiver_id, message.sender_id, -1)
+
+
+def mark_conversation_read(reader_id, sender_id, up_to_id=None):
+    """Mark ``sender_id``'s messages to ``reader_id`` as read and return how many changed.
+
+    With ``up_to_id`` only messages up to that id are marked (WebSocket read
+    receipts). Uses the ``(receiver, sender, is_read)`` index.
+    """
+    from .models import Message
+
+    unread = Message.objects.filter(receiver_id=reader_id, sender_id=sender_id, is_read=False)
+    if up_to_id is not None:
+        unread = unread.filter(id__lte=up_to_id)
+
+    with transaction.atomic():
+        live = unread.filter(is_deleted=False).update(is_read=True)
+        deleted = unread.update(is_read=True)
+        if live:
+            _adjust(reader_id, sender_id, -live)
+    if live or deleted:
+        contacts.invalidate(reader_id)
+    return live + deleted
+
+
+def unread_by_sender(user_id, sender_ids=None):
+    """Return ``{sender_id: unread_count}`` for ``user_id``, optionally limited to ``sender_ids``"""
+    from .models import ConversationUnread
+
+    rows = ConversationUnread.objects.filter(user_id=user_id, count__gt=0)
+    if sender_ids is not None:
+        rows = rows.filter(other_user_id__in=sender_ids)
+    return dict(rows.values_list('other_user_id', 'count'))
+
+
+def reconcile():
+    """Recompute every counter from ``Message``; return ``(conversations, profiles)`` rewritten."""
+    from .models import ConversationUnread, Message, Profile
+
+    with transaction.atomic():
+        rows = (
+            Message.objects.filter(is_read=False, is_deleted=False)
+            .order_by().values('receiver_id', 'sender_id').annotate(n=Count('id'))
+        )
+        affected = set(ConversationUnread.objects.values_list('user_id', flat=True))
+        ConversationUnread.objects.all().delete()
+        ConversationUnread.objects.bulk_create([
+            ConversationUnread(user_id=row['receiver_id'], other_user_id=row['sender_id'], count=row['n'])
+            for row in rows
+        ], batch_size=500)
+
+        totals = dict(ConversationUnread.objects.values('user_id').annotate(total=Sum('count')).values_list('user_id', 'total'))
+        stale = Profile.objects.exclude(unread_messages_count=0).exclude(user_id__in=totals)
+        profiles = stale.update(unread_messages_count=0)
+        for user_id, total in totals.items():
+            profiles += Profile.objects.filter(user_id=user_id).exclude(unread_messages_count=total).update(
+                unread_messages_count=total
+            )
+    contacts.invalidate(*(affected | set(totals)))
+    return len(rows), profiles
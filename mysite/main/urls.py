@@ -20,7 +20,12 @@ urlpatterns = [
     path("interviews/", views.interviews_page, name="interviews"),
     path("applications/<int:app_id>/status/", views.update_application_status, name="update_application_status"),
     path("applications/<int:app_id>/schedule/", views.schedule_interview, name="schedule_interview"),
-    path("applications/<int:app_id>/invite.ics", views.download_interview_invite, name="download_interview_invite"),
+    path("applications/<int:app_id>/invite.pdf", views.download_interview_invite, name="download_interview_invite"),
+    path("applications/<int:app_id>/invite.ics", views.download_interview_ics, name="download_interview_ics"),
+    path("calendar/reset/", views.reset_calendar_feed, name="reset_calendar_feed"),
+    path("calendar/<str:token>/interviews.ics", views.interview_calendar_feed, name="interview_calendar_feed"),
+    # The job page doubles as the application form; both names count a view on GET.
+    path("jobs/<int:job_id>/", views.apply_job, name="job_detail"),
     path("jobs/<int:job_id>/apply/", views.apply_job, name="apply_job"),
     path("jobs/<int:job_id>/save/", views.toggle_save_job, name="toggle_save_job"),
 
@@ -82,11 +87,14 @@ urlpatterns = [
     path("admin-panel/login/", views.admin_login, name="admin_login"),
     path("admin-panel/logout/", views.logout_view, name="admin_logout"),
     path("admin-panel/dashboard/", views.admin_dashboard, name="admin_dashboard"),
+    path("admin-panel/audit-log/", views.admin_audit_log, name="admin_audit_log"),
     path("admin-panel/users/", views.admin_users, name="admin_users"),
     path("admin-panel/users/<int:user_id>/toggle-ban/", views.toggle_user_ban, name="toggle_user_ban"),
+    path("admin-panel/users/bulk/", views.admin_users_bulk, name="admin_users_bulk"),
     path("admin-panel/jobs/", views.admin_jobs, name="admin_jobs"),
     path("admin-panel/jobs/<int:job_id>/toggle-approval/", views.toggle_job_approval, name="toggle_job_approval"),
-    path("admin-panel/jobs/<int:job_id>/delete/", views.delete_job, name="delete_job"),
+    path("admin-panel/jobs/<int:job_id>/delete/", views.admin_delete_job, name="admin_delete_job"),
+    path("admin-panel/jobs/bulk/", views.admin_jobs_bulk, name="admin_jobs_bulk"),
     path('admin-panel/seed-skills/', views.seed_skills_view, name='seed_skills'),
     path("admin-panel/skills/", views.admin_skills, name="admin_skills"),
     path('admin-panel/skills/delete/<int:pk>/', views.admin_skill_delete, name='admin_skill_delete'),
@@ -97,6 +105,8 @@ urlpatterns = [
     # Employer Section
     path("employers/dashboard/", views.employer_dashboard, name="employer_dashboard"),
     path("employers/jobs/", views.manage_jobs, name="manage_jobs"),
+    path("employers/analytics/", views.employer_analytics, name="employer_analytics"),
+    path("employers/analytics/data/", views.employer_analytics_data, name="employer_analytics_data"),
     path("employers/employerpost_job/", views.employerpost_job, name="employerpost_job"),
     path("employers/messages/", views.employer_messages_inbox, name="employer_messages"),
     path("employers/messages/<int:applicant_id>/", views.employer_message_conversation, name="employer_message_conversation"),
@@ -108,6 +118,7 @@ urlpatterns = [
     # Employer interview detail (for scheduling/confirmation)
     path("employers/applicants/<int:app_id>/interview/", views.employer_interview_detail, name="employer_interview_detail"),
     path("employers/applicants/<int:app_id>/schedule/", views.employer_schedule_interview, name="employer_schedule_interview"),
+    path("employers/interviews/batch/", views.employer_batch_schedule, name="employer_batch_schedule"),
     path("employers/preferences/skills/", views.employer_skill_preferences, name="employer_skill_preferences"),
  
 
@@ -116,6 +127,7 @@ urlpatterns = [
     path("api/notifications/<int:notification_id>/mark-read/", views.api_notification_mark_read, name="api_notification_mark_read"),
     path("api/notifications/mark-all-read/", views.api_notifications_mark_all_read, name="api_notifications_mark_all_read"),
     path("api/global-notifications/", views.api_global_notifications_list, name="api_global_notifications_list"),
+    path("api/messages/<int:user_id>/history/", views.api_message_history, name="api_message_history"),
     
     # Real-time API Test Page
     path("realtime-test/", lambda request: render(request, "main/realtime_test.html"), name="realtime_test"),
@@ -1,3 +1,5 @@
+import time
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
@@ -5,37 +7,38 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 from django.contrib import messages
 from django.db import IntegrityError
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
-from django.db.models import Count, Max
+from django.db.models import Count, F, Max
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.core.mail import send_mail, EmailMessage
 from django.utils import timezone
+from django.core.paginator import Paginator
 from django.urls import reverse
-from django.http import JsonResponse, HttpResponse
-from datetime import timedelta, datetime, timezone as dt_timezone
-from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.http import FileResponse, JsonResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.core.handlers.asgi import ASGIRequest
+from datetime import timedelta, datetime
 from .models import Post
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseForbidden
 from .models import AuditLog
 
 from .models import Profile, Job, JobApplication, Notification, Skill, Message, SavedJob, SkillTag, GlobalNotification
+from .popularity import engine as popularity_engine, record_job_event
+from .chat import HISTORY_PAGE_SIZE, conversation_history, push_message_event, push_read_receipt, serialize_message
+from . import search as message_search
+from .contacts import sidebar_contacts
+from .unread import mark_conversation_read, message_removed
+from .export import astream_export_zip, export_filename, stream_export_zip
+from .audit import add_audit_log, add_audit_logs, filter_entries as filter_audit_entries
+from .pagination import keyset_filter, take_page
+from . import analytics, ics, rollups, scheduling
+from . import pdf as interview_pdf
+from .bulkjobs import delete_jobs, duplicate_jobs
 
 
-def add_audit_log(request, user, action):
-    """Convenience helper to create an AuditLog entry with IP detection."""
-    ip = request.META.get('HTTP_X_FORWARDED_FOR')
-    if ip:
-        ip = ip.split(',')[0].strip()
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    AuditLog.objects.create(user=user, action=action, ip_address=ip)
-
 from .forms import JobForm, PostForm, SkillForm, UserForm, ProfileForm, SettingsForm, SignUpForm, JobApplicationForm
 
 from django.contrib.auth import logout as django_logout
@@ -71,15 +74,18 @@ def admin_dashboard(request):
     if not request.user.is_superuser:
         return HttpResponseForbidden()
 
-    recent_logs = AuditLog.objects.select_related('user').order_by('-timestamp')[:10]
+    recent_logs = AuditLog.objects.select_related('user').order_by('-timestamp', '-id')[:10]
 
     # <-- added: fetch recent user-level notifications for admin overview
     recent_user_notifications = Notification.objects.select_related('user', 'related_user').order_by('-created_at')[:10]
     unread_user_notifications_count = Notification.objects.filter(is_read=False).count()
 
+    totals = rollups.totals()
+
     context = {
-        "total_users": User.objects.count(),
-        "total_jobs": Job.objects.count(),
+        "total_users": totals["users"],
+        "total_jobs": totals["jobs"],
+        "charts": rollups.dashboard_charts(days=30),
         "recent_logs": recent_logs,
         # <-- added keys
         "user_notifications": recent_user_notifications,
@@ -87,15 +93,91 @@ def admin_dashboard(request):
     }
     return render(request, "admin/admin_dashboard.html", context)
 
+ADMIN_PAGE_SIZE = 50
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+    except ValueError:
+        return None
+
+def _admin_page(request, queryset, sorts, default_sort):
+    """Keyset-paginate an admin list.
+
+    ``sorts`` maps the ``?sort=`` value to ``(field, descending)``; ``?after=<id>``
+    continues after that row, so deep pages cost the same as the first one.
+    """
+    sort = request.GET.get("sort") if request.GET.get("sort") in sorts else default_sort
+    field, descending = sorts[sort]
+    after_id = request.GET.get("after", "")
+    after = after_id.isdigit() and queryset.model._default_manager.filter(pk=after_id).values(field, "pk").first()
+    if after:
+        queryset = keyset_filter(queryset, field, after[field], after["pk"], descending=descending)
+    prefix = "-" if descending else ""
+    rows, has_more = take_page(queryset.order_by(prefix + field, prefix + "pk"), ADMIN_PAGE_SIZE)
+
+    query = request.GET.copy()
+    query.pop("after", None)
+    return {
+        "rows": rows,
+        "has_more": has_more,
+        "next_after": rows[-1].pk if has_more else None,
+        "sort": sort,
+        "filters": request.GET,
+        "base_query": query.urlencode(),
+    }
+
+def _selected_ids(request):
+    return [int(pk) for pk in request.POST.getlist("selected") if pk.isdigit()]
+
+def _back_to_list(request, fallback):
+    """Return to the list page the bulk form was posted from, keeping its filters."""
+    target = request.POST.get("next", "")
+    if url_has_allowed_host_and_scheme(target, allowed_hosts={request.get_host()}):
+        return redirect(target)
+    return redirect(fallback)
+
+@login_required(login_url="/admin-panel/login/")
+def admin_audit_log(request):
+    if not request.user.is_superuser:
+        return HttpResponseForbidden()
+
+    logs = filter_audit_entries(
+        AuditLog.objects.select_related('user'),
+        username=request.GET.get("user", "").strip(),
+        action_prefix=request.GET.get("action", "").strip(),
+        ip=request.GET.get("ip", "").strip(),
+        date_from=_parse_date(request.GET.get("from")),
+        date_to=_parse_date(request.GET.get("to")),
+    )
+    page = _admin_page(request, logs, {"newest": ("timestamp", True)}, "newest")
+    return render(request, "admin/admin_audit_log.html", page)
+
 # ============= USER MANAGEMENT =============
 
+USER_SORTS = {
+    "newest": ("date_joined", True),
+    "oldest": ("date_joined", False),
+    "username": ("username", False),
+}
+
 @login_required(login_url="/admin-panel/login/")
 def admin_users(request):
     if not request.user.is_superuser:
         return HttpResponseForbidden()
 
-    users = User.objects.exclude(is_superuser=True)
-    return render(request, "admin/admin_users.html", {"users": users})
+    users = (
+        User.objects.filter(is_superuser=False)
+        .select_related('profile')
+        .annotate(application_count=Count('jobapplication'))
+    )
+    q = request.GET.get("q", "").strip()
+    if q:
+        users = users.filter(Q(username__istartswith=q) | Q(email__istartswith=q))
+    status = request.GET.get("status")
+    if status in ("active", "banned"):
+        users = users.filter(is_active=status == "active")
+    return render(request, "admin/admin_users.html", _admin_page(request, users, USER_SORTS, "newest"))
 
 @login_required(login_url="/admin-panel/login/")
 def toggle_user_ban(request, user_id):
@@ -105,41 +187,107 @@ def toggle_user_ban(request, user_id):
     user = get_object_or_404(User, id=user_id)
     user.is_active = not user.is_active
     user.save()
-    add_audit_log(request, request.user, f"Toggled user active for '{user.username}' -> is_active={user.is_active}")
+    add_audit_log(request, request.user, f"Toggled user active for '{user.username}' -> is_active={user.is_active}", sync=True)
     return redirect("admin_users")
 
+@login_required(login_url="/admin-panel/login/")
+def admin_users_bulk(request):
+    if not request.user.is_superuser:
+        return HttpResponseForbidden()
+    if request.method != "POST":
+        return redirect("admin_users")
+
+    action = request.POST.get("action")
+    if action not in ("ban", "unban"):
+        messages.error(request, "Choose an action.")
+        return redirect("admin_users")
+
+    targets = User.objects.filter(id__in=_selected_ids(request), is_superuser=False)
+    names = list(targets.values_list("username", flat=True))
+    is_active = action == "unban"
+    updated = targets.update(is_active=is_active)
+    add_audit_logs(request, request.user, [
+        f"Toggled user active for '{name}' -> is_active={is_active}" for name in names
+    ])
+    messages.success(request, f"{updated} user(s) {'unbanned' if is_active else 'banned'}.")
+    return _back_to_list(request, "admin_users")
+
 # ============= JOB MANAGEMENT =============
 
+JOB_SORTS = {
+    "newest": ("id", True),
+    "oldest": ("id", False),
+    "title": ("title", False),
+}
+
 @login_required(login_url="/admin-panel/login/")
 def admin_jobs(request):
     if not request.user.is_superuser:
         return HttpResponseForbidden()
 
-    jobs = Job.objects.all().order_by('-id')
-    return render(request, "admin/admin_jobs.html", {"jobs": jobs})
+    jobs = Job.objects.select_related('user').annotate(application_count=Count('jobapplication'))
+    q = request.GET.get("q", "").strip()
+    if q:
+        jobs = jobs.filter(Q(title__icontains=q) | Q(company_name__icontains=q))
+    status = request.GET.get("status")
+    if status in dict(Job.STATUS_CHOICES):
+        jobs = jobs.filter(status=status)
+    return render(request, "admin/admin_jobs.html", {
+        **_admin_page(request, jobs, JOB_SORTS, "newest"),
+        "status_choices": Job.STATUS_CHOICES,
+    })
 
 @login_required(login_url="/admin-panel/login/")
 def toggle_job_approval(request, job_id):
     if not request.user.is_superuser:
         return HttpResponseForbidden()
 
+    # Jobs have no separate approval flag: approving makes a job active, rejecting pauses it.
     job = get_object_or_404(Job, id=job_id)
-    job.is_approved = not job.is_approved
-    job.save()
-    add_audit_log(request, request.user, f"Toggled job approval for '{job.title}' (id:{job.id}) -> is_approved={job.is_approved}")
+    job.status = 'paused' if job.status == 'active' else 'active'
+    job.save(update_fields=['status'])
+    add_audit_log(request, request.user, f"Set job '{job.title}' (id:{job.id}) status -> {job.status}", sync=True)
     return redirect('admin_jobs')
 
 @login_required(login_url="/admin-panel/login/")
-def delete_job(request, job_id):
+def admin_delete_job(request, job_id):
     if not request.user.is_superuser:
         return HttpResponseForbidden()
 
     job = get_object_or_404(Job, id=job_id)
     title = job.title
+    ics.invalidate_job_feeds([job.pk])
     job.delete()
-    add_audit_log(request, request.user, f"Admin deleted job '{title}' (id:{job_id})")
+    add_audit_log(request, request.user, f"Admin deleted job '{title}' (id:{job_id})", sync=True)
     return redirect('admin_jobs')
 
+JOB_BULK_STATUS = {"activate": "active", "pause": "paused", "close": "closed"}
+
+@login_required(login_url="/admin-panel/login/")
+def admin_jobs_bulk(request):
+    if not request.user.is_superuser:
+        return HttpResponseForbidden()
+    if request.method != "POST":
+        return redirect("admin_jobs")
+
+    action = request.POST.get("action")
+    targets = Job.objects.filter(id__in=_selected_ids(request))
+    jobs = list(targets.values_list("id", "title"))
+    if action == "delete":
+        targets.delete()
+        add_audit_logs(request, request.user, [f"Admin deleted job '{title}' (id:{pk})" for pk, title in jobs])
+        messages.success(request, f"{len(jobs)} job(s) deleted.")
+    elif action in JOB_BULK_STATUS:
+        status = JOB_BULK_STATUS[action]
+        updated = targets.update(status=status)
+        add_audit_logs(request, request.user, [
+            f"Set job '{title}' (id:{pk}) status -> {status}" for pk, title in jobs
+        ])
+        messages.success(request, f"{updated} job(s) set to {status}.")
+    else:
+        messages.error(request, "Choose an action.")
+    return _back_to_list(request, "admin_jobs")
+
 def admin_skills(request):
     # 1. Get the Profile safely
     try:
@@ -160,7 +308,7 @@ def admin_skills(request):
                 level=level,
                 description=description
             )
-            add_audit_log(request, request.user, f"Admin added skill '{name}'")
+            add_audit_log(request, request.user, f"Admin added skill '{name}'", sync=True)
         return redirect('admin_skills')
 
     # 3. Fetch BOTH Global skills and Admin-owned skills
@@ -181,7 +329,7 @@ def admin_skill_delete(request, pk):
     if request.method == "POST":
         name = skill.name
         skill.delete()
-        add_audit_log(request, request.user, f"Admin deleted skill '{name}' (id:{pk})")
+        add_audit_log(request, request.user, f"Admin deleted skill '{name}' (id:{pk})", sync=True)
     return redirect('admin_skills')
 
 
@@ -211,7 +359,7 @@ def admin_notifications(request):
                 is_active=is_active,
                 expires_at=expires_at
             )
-            add_audit_log(request, request.user, f"Admin created global message '{gn.title}' (id:{gn.id})")
+            add_audit_log(request, request.user, f"Admin created global message '{gn.title}' (id:{gn.id})", sync=True)
             messages.success(request, "Global message created.")
             # TODO: if send_email, optionally send emails to users (not implemented here)
         else:
@@ -231,7 +379,7 @@ def admin_notification_delete(request, pk):
     if request.method == 'POST':
         title = gn.title
         gn.delete()
-        add_audit_log(request, request.user, f"Admin deleted global message '{title}' (id:{pk})")
+        add_audit_log(request, request.user, f"Admin deleted global message '{title}' (id:{pk})", sync=True)
         messages.success(request, "Global message deleted.")
     return redirect('admin_notifications')
 
@@ -256,10 +404,10 @@ def seed_skills_view(request):
 
     if created:
         messages.success(request, f"Seeded {created} skills.")
-        add_audit_log(request, request.user, f"Seeded {created} skills")
+        add_audit_log(request, request.user, f"Seeded {created} skills", sync=True)
     else:
         messages.info(request, "Skills already seeded.")
-        add_audit_log(request, request.user, "Seed skills called but nothing new was added")
+        add_audit_log(request, request.user, "Seed skills called but nothing new was added", sync=True)
 
     return redirect('admin_skills')
 
@@ -273,9 +421,10 @@ def employer_dashboard(request):
     my_jobs = Job.objects.filter(user=request.user).order_by('-created_at')
     my_job_ids = list(my_jobs.values_list('id', flat=True))
 
-    # Get totals scoped to the employer's jobs
-    total_applicants = JobApplication.objects.filter(job_id__in=my_job_ids).count()
-    total_interviews = JobApplication.objects.filter(job_id__in=my_job_ids, status='Interview').count()
+    # Get totals scoped to the employer's jobs (precomputed, see main/analytics.py)
+    counts = analytics.job_counts(request.user)
+    total_applicants = counts['applications']
+    total_interviews = counts['interviews']
 
     # Get notifications
     recent_notifications = Notification.objects.filter(user=request.user).order_by('-created_at')[:5]
@@ -285,31 +434,10 @@ def employer_dashboard(request):
     recent_applicants = JobApplication.objects.filter(job_id__in=my_job_ids).select_related('user', 'job').order_by('-applied_at')[:5]
 
     # Get recent conversations
-    conversations_dict = {}
-    for application in JobApplication.objects.filter(job_id__in=my_job_ids).select_related('user', 'job'):
-        if application.user not in conversations_dict:
-            last_msg = Message.objects.filter(
-                Q(sender=request.user, receiver=application.user) |
-                Q(sender=application.user, receiver=request.user),
-                is_deleted=False
-            ).select_related('sender', 'receiver').order_by('-sent_at').first()
-            
-            conversations_dict[application.user] = {
-                'user': application.user,
-                'display_name': application.user.profile.full_name or application.user.username,
-                'avatar_url': application.user.profile.profile_image.url if application.user.profile.profile_image else None,
-                'last_message': last_msg,
-                'applied_job': application.job.title,
-            }
+    recent_conversations = _get_employer_conversations(request.user).object_list[:5]
 
-    recent_conversations = sorted(
-        conversations_dict.values(),
-        key=lambda x: x['last_message'].sent_at if x['last_message'] else timezone.now(),
-        reverse=True
-    )[:5]
-
-    # Get unread messages count
-    unread_messages_count = Message.objects.filter(receiver=request.user, is_read=False).count()
+    # Get unread messages count (denormalised, see main/unread.py)
+    unread_messages_count = request.user.profile.unread_messages_count
 
     context = {
         'my_jobs': my_jobs,
@@ -340,31 +468,29 @@ def manage_jobs(request):
         if ids:
             target_qs = jobs_qs.filter(id__in=ids)
             if action == 'pause':
-                target_qs.update(status='paused')
-                messages.success(request, "Selected jobs paused.")
+                updated = target_qs.update(status='paused')
+                messages.success(request, f"{updated} job(s) paused.")
             elif action == 'close':
-                target_qs.update(status='closed')
-                messages.success(request, "Selected jobs closed.")
+                updated = target_qs.update(status='closed')
+                messages.success(request, f"{updated} job(s) closed.")
             elif action == 'reopen':
-                target_qs.update(status='active')
-                messages.success(request, "Selected jobs reopened.")
+                updated = target_qs.update(status='active')
+                messages.success(request, f"{updated} job(s) reopened.")
             elif action == 'delete':
-                count = target_qs.count()
-                target_qs.delete()
-                messages.success(request, f"Deleted {count} job(s).")
+                started = time.perf_counter()
+                jobs_deleted, applications_deleted = delete_jobs(target_qs)
+                messages.success(
+                    request,
+                    f"Deleted {jobs_deleted} job(s) and {applications_deleted} application(s) "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms."
+                )
             elif action == 'duplicate':
-                for job in target_qs:
-                    Job.objects.create(
-                        user=request.user,
-                        title=f"{job.title} (Copy)",
-                        company_name=job.company_name,
-                        description=job.description,
-                        location=job.location,
-                        employment_type=job.employment_type,
-                        working_schedule=job.working_schedule,
-                        status='draft'
-                    )
-                messages.success(request, "Duplicated selected job(s) as drafts.")
+                started = time.perf_counter()
+                created = duplicate_jobs(target_qs, request.user)
+                messages.success(
+                    request,
+                    f"Duplicated {created} job(s) as drafts in {(time.perf_counter() - started) * 1000:.0f} ms."
+                )
         return redirect('manage_jobs')
 
     # Filters
@@ -390,8 +516,8 @@ def manage_jobs(request):
     }
 
     jobs = jobs_qs.annotate(
-        applicants_count=Count('jobapplication'),
-        last_application=Max('jobapplication__applied_at')
+        applicants_count=Coalesce(F('stats__applications'), 0),
+        last_application=F('stats__last_application_at')
     ).order_by(sort_map.get(sort, '-created_at'))
 
     # Stats for filters
@@ -407,6 +533,26 @@ def manage_jobs(request):
     }
     return render(request, "employers/manage_jobs.html", context)
 
+@login_required
+def employer_analytics(request):
+    if request.user.profile.role != 'employer':
+        return HttpResponseForbidden()
+
+    return render(request, "employers/employer_analytics.html", {
+        "summary": analytics.employer_summary(request.user, days=30),
+    })
+
+@login_required
+def employer_analytics_data(request):
+    if request.user.profile.role != 'employer':
+        return JsonResponse({"error": "Forbidden"}, status=403)
+
+    try:
+        days = min(max(int(request.GET.get("days", 30)), 1), 365)
+    except ValueError:
+        days = 30
+    return JsonResponse(analytics.employer_summary(request.user, days=days))
+
 @login_required
 def employerpost_job(request):
     profile = getattr(request.user, "profile", None)
@@ -745,9 +891,10 @@ def homepage(request):
     # Simple recommended users list (exclude self)
     recommended_users = User.objects.exclude(id=request.user.id)[:5]
 
-    # Stub data for industries and popular_jobs if not provided elsewhere
+    # Stub data for industries if not provided elsewhere
     industries = []
-    popular_jobs = []
+    # Live ranking; kept up to date over ws/popular-jobs/
+    popular_jobs = popularity_engine.top_jobs()
 
     # Determine if user is an employer
     is_employer = profile.role == "employer"
@@ -1022,18 +1169,23 @@ def job_applications_page(request):
 # ============================
 @login_required
 def interviews_page(request):
+    calendar_feed_url = request.build_absolute_uri(
+        reverse('interview_calendar_feed', args=[ics.feed_token(request.user)])
+    )
     if request.user.profile.role == "employer":
         my_jobs = Job.objects.filter(user=request.user)
         applications = JobApplication.objects.filter(job__in=my_jobs, status='Interview').select_related('user', 'job', 'user__profile')
         return render(request, "main/interviews.html", {
             "applications": applications,
-            "is_employer": True
+            "is_employer": True,
+            "calendar_feed_url": calendar_feed_url,
         })
     else:
         applications = JobApplication.objects.filter(user=request.user, status='Interview').select_related('job', 'job__user', 'job__user__profile')
         return render(request, "main/interviews.html", {
             "applications": applications,
-            "is_employer": False
+            "is_employer": False,
+            "calendar_feed_url": calendar_feed_url,
         })
 
 
@@ -1099,6 +1251,16 @@ def update_application_status(request, app_id: int):
 # ============================
 # Schedule interview + generate ICS invite
 # ============================
+def _interview_clashes(employer, application):
+    """How many of the employer's other interviews overlap this one."""
+    if not application.interview_scheduled_at:
+        return 0
+    return len(scheduling.conflicts(
+        employer, application.interview_scheduled_at, application.interview_duration_minutes,
+        exclude_id=application.id,
+    ))
+
+
 @login_required
 def schedule_interview(request, app_id: int):
     application = get_object_or_404(JobApplication, id=app_id)
@@ -1114,10 +1276,7 @@ def schedule_interview(request, app_id: int):
         time_only = request.POST.get('time')
         location = request.POST.get('location', '')
         meeting_url = request.POST.get('meeting_url', '')
-        try:
-            duration_minutes = int(request.POST.get('duration_minutes', '45'))
-        except ValueError:
-            duration_minutes = 45
+        duration_minutes = scheduling.parse_duration(request.POST.get('duration_minutes'))
 
         try:
             naive = None
@@ -1141,10 +1300,14 @@ def schedule_interview(request, app_id: int):
             return redirect('employer_applicants')
 
         application.interview_scheduled_at = aware_dt
+        application.interview_duration_minutes = duration_minutes
         application.interview_location = location or None
         application.interview_meeting_url = meeting_url or None
         application.status = 'Interview'
-        application.save()
+        with transaction.atomic():
+            # Serialise with batch scheduling (main/scheduling.py)
+            scheduling.lock_calendars([request.user.id, application.user_id])
+            application.save()
 
         # Notify applicant
         Notification.objects.create(
@@ -1158,59 +1321,15 @@ def schedule_interview(request, app_id: int):
 
         # Email ICS invite to applicant
         if application.interview_scheduled_at:
-            start = application.interview_scheduled_at
-            end = start + timedelta(minutes=duration_minutes)
-            dtstamp = _format_ics_dt(timezone.now())
-            dtstart = _format_ics_dt(start)
-            dtend = _format_ics_dt(end)
-            summary = f"Interview: {application.job.title}"
-            description_lines = [
-                f"Job: {application.job.title}",
-            ]
-            if application.interview_meeting_url:
-                description_lines.append(f"Meeting URL: {application.interview_meeting_url}")
-            if application.interview_location:
-                description_lines.append(f"Location: {application.interview_location}")
-            description = "\\n".join(description_lines)
-
-            ics = (
-                "BEGIN:VCALENDAR\n"
-                "VERSION:2.0\n"
-                "PRODID:-//ADS Django//EN\n"
-                "METHOD:REQUEST\n"
-                "BEGIN:VEVENT\n"
-                f"UID:jobapp-{application.id}@mysite\n"
-                f"DTSTAMP:{dtstamp}\n"
-                f"DTSTART:{dtstart}\n"
-                f"DTEND:{dtend}\n"
-                f"SUMMARY:{summary}\n"
-                f"DESCRIPTION:{description}\n"
-                "END:VEVENT\n"
-                "END:VCALENDAR\n"
-            )
-
-            subject = f"Interview Scheduled: {application.job.title}"
-            body = (
-                f"Hi {application.user.first_name or application.user.username},\n\n"
-                f"Your interview for '{application.job.title}' has been scheduled.\n"
-                f"When: {start.strftime('%b %d, %Y %I:%M %p %Z')}\n"
-                f"Where: {application.interview_location or 'Online'}\n"
-                f"Meeting: {application.interview_meeting_url or 'N/A'}\n\n"
-                "An event invite is attached."
-            )
-            email = EmailMessage(
-                subject,
-                body,
-                settings.DEFAULT_FROM_EMAIL,
-                [application.user.email]
-            )
-            email.attach(filename=f"interview-{application.id}.ics", content=ics, mimetype='text/calendar')
             try:
-                email.send(fail_silently=True)
+                scheduling.invite_email(application).send(fail_silently=True)
             except Exception:
                 pass
 
         msg_text = 'Interview scheduled; invite emailed and ready to download.'
+        clashes = _interview_clashes(request.user, application)
+        if clashes:
+            msg_text += f' Note: it overlaps {clashes} other interview(s) of yours.'
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({
                 'success': True,
@@ -1218,19 +1337,14 @@ def schedule_interview(request, app_id: int):
                 'scheduled_at': application.interview_scheduled_at.isoformat() if application.interview_scheduled_at else None,
                 'location': application.interview_location,
                 'meeting_url': application.interview_meeting_url,
-                'download_url': reverse('download_interview_invite', args=[application.id])
+                'download_url': reverse('download_interview_invite', args=[application.id]),
+                'ics_url': reverse('download_interview_ics', args=[application.id]),
             })
 
         messages.success(request, msg_text)
         return redirect('employer_interview_detail', app_id=application.id)
 
 
-def _format_ics_dt(dt):
-    # Use stdlib UTC timezone to avoid relying on django.utils.timezone.utc
-    dt_utc = dt.astimezone(dt_timezone.utc)
-    return dt_utc.strftime('%Y%m%dT%H%M%SZ')
-
-
 @login_required
 def download_interview_invite(request, app_id: int):
     application = get_object_or_404(JobApplication, id=app_id)
@@ -1243,103 +1357,72 @@ def download_interview_invite(request, app_id: int):
         messages.error(request, 'No interview schedule set for this application.')
         return redirect('job_applications')
 
-    # Create PDF in memory
-    pdf_buffer = BytesIO()
-    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter,
-                           rightMargin=0.5*inch, leftMargin=0.5*inch,
-                           topMargin=0.75*inch, bottomMargin=0.75*inch)
-    
-    # Container for PDF elements
-    elements = []
-    
-    # Define styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1e293b'),
-        spaceAfter=30,
-        alignment=1  # Center
-    )
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#1e293b'),
-        spaceAfter=12,
-        spaceBefore=12
-    )
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#475569'),
-        spaceAfter=6
-    )
-    
-    # Title
-    elements.append(Paragraph("Interview Invitation", title_style))
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # Job and Applicant Info
-    elements.append(Paragraph("Interview Details", heading_style))
-    
-    interview_data = [
-        ["Position:", application.job.title],
-        ["Applicant:", application.user.profile.full_name or application.user.username],
-        ["Date:", application.interview_scheduled_at.strftime('%B %d, %Y')],
-        ["Time:", application.interview_scheduled_at.strftime('%I:%M %p')],
-    ]
-    
-    if application.interview_location:
-        interview_data.append(["Location:", application.interview_location])
-    
-    if application.interview_meeting_url:
-        interview_data.append(["Meeting URL:", application.interview_meeting_url])
-    
-    interview_table = Table(interview_data, colWidths=[1.5*inch, 4.5*inch])
-    interview_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f1f5f9')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#1e293b')),
-        ('ALIGN', (0, 0), (0, -1), 'LEFT'),
-        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-    ]))
-    elements.append(interview_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Additional Information
-    elements.append(Paragraph("Important Information", heading_style))
-    elements.append(Paragraph("• Please arrive 5-10 minutes early", normal_style))
-    elements.append(Paragraph("• Have a valid ID ready for verification", normal_style))
-    if application.interview_meeting_url:
-        elements.append(Paragraph("• Test your internet connection and audio/video before the meeting", normal_style))
-    else:
-        elements.append(Paragraph("• Bring all necessary documents and references", normal_style))
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Footer
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#94a3b8'),
-        alignment=1
+    # Rendered once per schedule and cached on disk (see main/pdf.py)
+    etag = f'"{interview_pdf.invite_etag(application)}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    invite_file, _ = interview_pdf.cached_invite(application)
+    response = FileResponse(
+        invite_file, as_attachment=True,
+        filename=f'interview-invitation-{application.id}.pdf', content_type='application/pdf',
     )
-    elements.append(Paragraph("This is an automated invitation. Please confirm your attendance at your earliest convenience.", footer_style))
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Return PDF as response
-    pdf_buffer.seek(0)
-    response = HttpResponse(pdf_buffer.read(), content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=interview-invitation-{application.id}.pdf'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@login_required
+def download_interview_ics(request, app_id: int):
+    application = get_object_or_404(JobApplication.objects.select_related('job__user', 'user__profile'), id=app_id)
+    if not (application.user == request.user or application.job.user == request.user):
+        messages.error(request, 'You do not have access to this invite.')
+        return redirect('homepage')
+
+    if not application.interview_scheduled_at:
+        messages.error(request, 'No interview schedule set for this application.')
+        return redirect('job_applications')
+
+    body, digest = ics.invite(application)
+    etag = f'"{digest}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="interview-{application.id}.ics"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@login_required
+def reset_calendar_feed(request):
+    """Revoke the user's calendar feed URL and issue a new one."""
+    if request.method == 'POST':
+        ics.reset_feed_token(request.user)
+        messages.success(request, 'Your calendar link was reset. Subscribe again with the new link.')
+    return redirect('interviews')
+
+
+def interview_calendar_feed(request, token):
+    """Subscribable calendar of the token owner's interviews; no login, the signed token is the credential."""
+    user_id = ics.user_id_for_token(token)
+    if user_id is None:
+        raise Http404
+
+    # The version changes with any interview of this user, so a matching
+    # If-None-Match is answered without touching the database.
+    version = ics.feed_version(user_id)
+    etag = f'"{user_id}-{version}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = HttpResponse(ics.feed(user_id, version), content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
     return response
 
 
@@ -1397,6 +1480,94 @@ def employer_schedule_interview(request, app_id: int):
         'time_options': time_options,
     })
 
+
+BATCH_SCHEDULE_MAX = 200
+
+
+@login_required
+def employer_batch_schedule(request):
+    """Schedule interviews for several applicants at once inside availability windows.
+
+    "Preview" shows the proposed slots; "Schedule" plans again and saves them
+    (see main/scheduling.py).
+    """
+    if request.user.profile.role != 'employer':
+        return HttpResponseForbidden()
+
+    candidates = (
+        JobApplication.objects.filter(job__user=request.user)
+        .exclude(status__in=['Accepted', 'Rejected'])
+        .select_related('job', 'user__profile')
+        .order_by('job__title', 'applied_at')
+    )
+    job_filter = request.GET.get('job') or request.POST.get('job') or ''
+    if job_filter.isdigit():
+        candidates = candidates.filter(job_id=job_filter)
+
+    context = {
+        'candidates': candidates[:BATCH_SCHEDULE_MAX],
+        'available_jobs': Job.objects.filter(user=request.user).only('id', 'title').order_by('title'),
+        'current_job': job_filter,
+        'selected_ids': {int(pk) for pk in request.GET.getlist('ids') if pk.isdigit()},
+        'window_rows': [
+            {'date': (timezone.localdate() + timedelta(days=1)).isoformat(), 'start': '09:00', 'end': '12:00'},
+            {'date': '', 'start': '', 'end': ''},
+            {'date': '', 'start': '', 'end': ''},
+        ],
+        'duration_minutes': scheduling.DEFAULT_DURATION_MINUTES,
+        'buffer_minutes': 0,
+        'location': '',
+        'meeting_url': '',
+    }
+
+    if request.method == 'POST':
+        ids = [int(pk) for pk in request.POST.getlist('app_ids') if pk.isdigit()][:BATCH_SCHEDULE_MAX]
+        dates = request.POST.getlist('window_date')
+        starts = request.POST.getlist('window_start')
+        ends = request.POST.getlist('window_end')
+        duration_minutes = scheduling.parse_duration(request.POST.get('duration_minutes'))
+        try:
+            buffer_minutes = min(max(int(request.POST.get('buffer_minutes', 0)), 0), 120)
+        except ValueError:
+            buffer_minutes = 0
+        location = request.POST.get('location', '').strip()
+        meeting_url = request.POST.get('meeting_url', '').strip()
+        context.update({
+            'selected_ids': set(ids),
+            'window_rows': [{'date': d, 'start': s, 'end': e} for d, s, e in zip(dates, starts, ends)],
+            'duration_minutes': duration_minutes,
+            'buffer_minutes': buffer_minutes,
+            'location': location,
+            'meeting_url': meeting_url,
+        })
+
+        try:
+            windows = scheduling.parse_windows(dates, starts, ends)
+        except ValueError:
+            windows = None
+            messages.error(request, 'Invalid date/time in availability windows.')
+        if windows is not None and not windows:
+            messages.error(request, 'Add at least one availability window.')
+        elif windows and not ids:
+            messages.error(request, 'Select at least one applicant.')
+        elif windows:
+            # Keep the employer's selection order stable: earliest applicants first
+            applications = list(candidates.filter(pk__in=ids).order_by('applied_at'))
+            plan = scheduling.plan(
+                request.user, applications, windows,
+                duration_minutes=duration_minutes, buffer_minutes=buffer_minutes,
+            )
+            if request.POST.get('action') == 'schedule':
+                scheduled = scheduling.commit(plan, request.user, location=location, meeting_url=meeting_url)
+                if scheduled:
+                    messages.success(request, f'Scheduled {scheduled} interview(s); invites are on their way.')
+                if plan.unassigned:
+                    messages.warning(request, f'{len(plan.unassigned)} applicant(s) did not fit in the windows given.')
+                return redirect('employer_applicants')
+            context['plan'] = plan
+
+    return render(request, 'employers/employer_batch_schedule.html', context)
+
 # ============================
 # SKILLS
 # ============================
@@ -1476,50 +1647,11 @@ def delete_skill(request, skill_id):
 # ============================
 @login_required
 def messages_inbox(request):
-    msgs = Message.objects.filter(
-        Q(sender=request.user) | Q(receiver=request.user),
-        is_deleted=False
-    ).select_related('sender', 'receiver', 'sender__profile', 'receiver__profile').order_by("-sent_at")
-
-    conversations = {}
-    for m in msgs:
-        other = m.receiver if m.sender == request.user else m.sender
-        if other not in conversations:
-            conversations[other] = {
-                'user': other,
-                'display_name': other.profile.full_name or other.username,
-                'avatar_url': other.profile.profile_image.url if other.profile.profile_image else None,
-                'last_message': m
-            }
-
-    # Seed contacts from prior interactions (applications) even if no messages yet
-    if request.user.profile.role == 'job_seeker':
-        employer_users = User.objects.filter(
-            job__jobapplication__user=request.user
-        ).distinct().select_related('profile')
-        for emp in employer_users:
-            if emp not in conversations:
-                conversations[emp] = {
-                    'user': emp,
-                    'display_name': emp.profile.full_name or emp.username,
-                    'avatar_url': emp.profile.profile_image.url if emp.profile.profile_image else None,
-                    'last_message': None,
-                }
-    else:  # employer
-        applicant_users = User.objects.filter(
-            jobapplication__job__user=request.user
-        ).distinct().select_related('profile')
-        for appl in applicant_users:
-            if appl not in conversations:
-                conversations[appl] = {
-                    'user': appl,
-                    'display_name': appl.profile.full_name or appl.username,
-                    'avatar_url': appl.profile.profile_image.url if appl.profile.profile_image else None,
-                    'last_message': None,
-                }
+    contacts_page = sidebar_contacts(request.user, request.GET.get("contacts_page", 1))
 
     return render(request, "main/messages.html", {
-        "conversations": conversations.values()
+        "conversations": contacts_page.object_list,
+        "contacts_page": contacts_page,
     })
 
 
@@ -1535,6 +1667,7 @@ def conversation_view(request, user_id):
                 receiver=other,
                 content=content
             )
+            push_message_event(msg, "message")
             add_audit_log(request, request.user, f"Sent message to {other.username}: {content[:120]}")
             # Create notification for receiver
             Notification.objects.create(
@@ -1547,67 +1680,41 @@ def conversation_view(request, user_id):
             )
         return redirect("conversation", user_id=user_id)
 
-    # Get all messages in the conversation
-    convo = Message.objects.filter(
-        Q(sender=request.user, receiver=other) |
-        Q(sender=other, receiver=request.user),
-        is_deleted=False
-    ).select_related('sender', 'receiver').order_by("sent_at")
+    # Latest page of the conversation; older pages are lazy-loaded from api_message_history
+    convo, has_more_history = conversation_history(request.user.id, other.id)
 
     # Mark unread messages as read
-    Message.objects.filter(
-        sender=other, receiver=request.user, is_read=False
-    ).update(is_read=True)
+    if mark_conversation_read(request.user.id, other.id):
+        push_read_receipt(request.user.id, other.id)
 
-    # Get all conversations for sidebar
-    msgs = Message.objects.filter(
-        Q(sender=request.user) | Q(receiver=request.user),
-        is_deleted=False
-    ).select_related('sender', 'receiver', 'sender__profile', 'receiver__profile').order_by("-sent_at")
-
-    conversations = {}
-    for m in msgs:
-        conv_other = m.receiver if m.sender == request.user else m.sender
-        if conv_other not in conversations:
-            conversations[conv_other] = {
-                'user': conv_other,
-                'display_name': conv_other.profile.full_name or conv_other.username,
-                'avatar_url': conv_other.profile.profile_image.url if conv_other.profile.profile_image else None,
-                'last_message': m
-            }
-
-    # Seed contacts from applications
-    if request.user.profile.role == 'job_seeker':
-        employer_users = User.objects.filter(
-            job__jobapplication__user=request.user
-        ).distinct().select_related('profile')
-        for emp in employer_users:
-            if emp not in conversations:
-                conversations[emp] = {
-                    'user': emp,
-                    'display_name': emp.profile.full_name or emp.username,
-                    'avatar_url': emp.profile.profile_image.url if emp.profile.profile_image else None,
-                    'last_message': None,
-                }
-    else:
-        applicant_users = User.objects.filter(
-            jobapplication__job__user=request.user
-        ).distinct().select_related('profile')
-        for appl in applicant_users:
-            if appl not in conversations:
-                conversations[appl] = {
-                    'user': appl,
-                    'display_name': appl.profile.full_name or appl.username,
-                    'avatar_url': appl.profile.profile_image.url if appl.profile.profile_image else None,
-                    'last_message': None,
-                }
+    # Sidebar contacts (cached; see main/contacts.py)
+    contacts_page = sidebar_contacts(request.user, request.GET.get("contacts_page", 1))
 
     return render(request, "main/messages.html", {
         "conversation_user": other,
         "conversation_user_display": other.profile.full_name or other.username,
         "conversation_user_avatar": other.profile.profile_image.url if other.profile.profile_image else None,
         "messages_qs": convo,
-        "conversations": conversations.values(),
+        "has_more_history": has_more_history,
+        "conversations": contacts_page.object_list,
+        "contacts_page": contacts_page,
+    })
+
+
+@login_required
+def api_message_history(request, user_id):
+    """REST API: one page of a conversation, newest first, addressed by ``before_id``"""
+    try:
+        before_id = int(request.GET.get('before_id') or 0) or None
+        limit = max(1, min(int(request.GET.get('limit') or HISTORY_PAGE_SIZE), 100))
+    except ValueError:
+        return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+    page, has_more = conversation_history(request.user.id, user_id, before_id=before_id, limit=limit)
+    return JsonResponse({
+        'messages': [serialize_message(m) for m in page],
+        'has_more': has_more,
+        'next_before_id': page[0].id if page else None,
     })
 
 
@@ -1623,6 +1730,7 @@ def edit_message(request, message_id):
             message.is_edited = True
             message.edited_at = timezone.now()
             message.save()
+            push_message_event(message, "edited")
             return JsonResponse({"success": True, "content": content, "edited_at": message.edited_at.strftime("%b %d, %H:%M")})
     
     return JsonResponse({"success": False, "error": "Invalid request"})
@@ -1634,15 +1742,32 @@ def delete_message(request, message_id):
     message = get_object_or_404(Message, id=message_id, sender=request.user)
     
     if request.method == "POST":
+        was_deleted = message.is_deleted
         message.is_deleted = True
         message.deleted_at = timezone.now()
         message.content = "[Message deleted]"
         message.save()
+        if not was_deleted:
+            message_removed(message)
+        push_message_event(message, "deleted")
         return JsonResponse({"success": True})
     
     return JsonResponse({"success": False, "error": "Invalid request"})
 
 
+def _search_result(msg, snippet, user):
+    other_user = msg.receiver if msg.sender_id == user.id else msg.sender
+    return {
+        "id": msg.id,
+        "content": msg.content,
+        "snippet": snippet,
+        "sent_at": msg.sent_at.strftime("%b %d, %H:%M"),
+        "other_user_id": other_user.id,
+        "other_user_name": other_user.profile.full_name or other_user.username,
+        "is_sender": msg.sender_id == user.id
+    }
+
+
 @login_required
 def search_messages(request):
     """Search messages in conversations"""
@@ -1650,24 +1775,11 @@ def search_messages(request):
     if not query:
         return JsonResponse({"results": []})
     
-    # Search in messages where user is sender or receiver
-    messages_found = Message.objects.filter(
-        Q(sender=request.user) | Q(receiver=request.user),
-        content__icontains=query,
-        is_deleted=False
-    ).select_related('sender', 'receiver', 'sender__profile', 'receiver__profile').order_by('-sent_at')[:20]
-    
-    results = []
-    for msg in messages_found:
-        other_user = msg.receiver if msg.sender == request.user else msg.sender
-        results.append({
-            "id": msg.id,
-            "content": msg.content,
-            "sent_at": msg.sent_at.strftime("%b %d, %H:%M"),
-            "other_user_id": other_user.id,
-            "other_user_name": other_user.profile.full_name or other_user.username,
-            "is_sender": msg.sender == request.user
-        })
+    # Ranked full-text hits with highlighted snippets (see main/search.py)
+    results = [
+        _search_result(msg, snippet, request.user)
+        for msg, snippet in message_search.search_messages(request.user, query)
+    ]
     
     return JsonResponse({"results": results})
 
@@ -1811,7 +1923,14 @@ def data_control(request):
         action = request.POST.get('action')
         
         if action == 'download':
-            messages.info(request, "Your data export has been requested. You'll receive an email when it's ready.")
+            add_audit_log(request, request.user, "Downloaded personal data export", sync=True)
+            if isinstance(request, ASGIRequest):
+                chunks = astream_export_zip(request.user)
+            else:
+                chunks = stream_export_zip(request.user)
+            response = StreamingHttpResponse(chunks, content_type="application/zip")
+            response["Content-Disposition"] = f'attachment; filename="{export_filename(request.user)}"'
+            return response
         elif action == 'deactivate':
             messages.warning(request, "Account deactivation feature coming soon.")
         elif action == 'delete':
@@ -1916,8 +2035,9 @@ def delete_job(request, job_id: int):
     job = get_object_or_404(Job, id=job_id, user=request.user)
     if request.method == "POST":
         title = job.title
+        ics.invalidate_job_feeds([job.pk])
         job.delete()
-        add_audit_log(request, request.user, f"Deleted job '{title}' (id:{job_id})")
+        add_audit_log(request, request.user, f"Deleted job '{title}' (id:{job_id})", sync=True)
         messages.success(request, "Job deleted.")
         return redirect("homepage")
     return redirect("homepage")
@@ -2004,6 +2124,8 @@ def apply_job(request, job_id):
             return redirect("job_applications")
     else:
         form = JobApplicationForm()
+        record_job_event(job.id, "view")
+        analytics.record_view(job.id)
     
     return render(request, "main/apply_job.html", {
         "job": job,
@@ -2024,6 +2146,7 @@ def toggle_save_job(request, job_id):
     if not created:
         # Job was already saved, so delete it
         saved_job.delete()
+        analytics.record_unsave(job.id)
         add_audit_log(request, request.user, f"Removed saved job '{job.title}' (id:{job.id})")
         messages.info(request, "Job removed from saved.")
         is_saved = False
@@ -2041,43 +2164,8 @@ def toggle_save_job(request, job_id):
 from .models import Skill
 
 # Helper: Build employer conversation list (job applicants with last message/unread counts)
-def _get_employer_conversations(user):
-    employer_jobs = Job.objects.filter(user=user)
-    job_applicants = JobApplication.objects.filter(job__in=employer_jobs).select_related('user', 'job')
-
-    conversations = {}
-    for application in job_applicants:
-        applicant = application.user
-        # Find last message exchanged (if any)
-        last_msg = Message.objects.filter(
-            Q(sender=user, receiver=applicant) | Q(sender=applicant, receiver=user),
-            is_deleted=False
-        ).select_related('sender', 'receiver').order_by('-sent_at').first()
-
-        # Count unread messages from this applicant to employer
-        unread_count = Message.objects.filter(
-            sender=applicant,
-            receiver=user,
-            is_read=False,
-            is_deleted=False
-        ).count()
-
-        # Only set once per applicant; prefer the latest message info if already present
-        if applicant not in conversations or (last_msg and conversations[applicant]['last_message'] and last_msg.sent_at > conversations[applicant]['last_message'].sent_at):
-            conversations[applicant] = {
-                'user': applicant,
-                'display_name': applicant.profile.full_name or applicant.username,
-                'avatar_url': applicant.profile.profile_image.url if applicant.profile.profile_image else None,
-                'last_message': last_msg,
-                'applied_job': application.job.title,
-                'unread_count': unread_count,
-            }
-
-    return sorted(
-        conversations.values(),
-        key=lambda x: x['last_message'].sent_at if x['last_message'] else timezone.now(),
-        reverse=True
-    )
+def _get_employer_conversations(user, page=1):
+    return sidebar_contacts(user, page, applicants_only=True)
 
 # ============================
 # EMPLOYER MESSAGING
@@ -2088,10 +2176,11 @@ def employer_messages_inbox(request):
     if request.user.profile.role != 'employer':
         return HttpResponseForbidden()
     
-    conversations = _get_employer_conversations(request.user)
+    contacts_page = _get_employer_conversations(request.user, request.GET.get("contacts_page", 1))
 
     return render(request, "employers/employer_messages.html", {
-        "conversations": conversations,
+        "conversations": contacts_page.object_list,
+        "contacts_page": contacts_page,
     })
 
 
@@ -2113,11 +2202,12 @@ def employer_message_conversation(request, applicant_id):
     if request.method == "POST":
         content = request.POST.get("message", "").strip()
         if content and len(content) > 0:
-            Message.objects.create(
+            msg = Message.objects.create(
                 sender=request.user,
                 receiver=applicant,
                 content=content
             )
+            push_message_event(msg, "message")
             add_audit_log(request, request.user, f"Sent message to applicant {applicant.username}: {content[:120]}")
             # Create notification for applicant
             Notification.objects.create(
@@ -2130,25 +2220,21 @@ def employer_message_conversation(request, applicant_id):
             )
         return redirect("employer_message_conversation", applicant_id=applicant_id)
     
-    # Get all messages in the conversation
-    convo = Message.objects.filter(
-        Q(sender=request.user, receiver=applicant) |
-        Q(sender=applicant, receiver=request.user),
-        is_deleted=False
-    ).select_related('sender', 'receiver').order_by("sent_at")
+    # Latest page of the conversation; older pages are lazy-loaded from api_message_history
+    convo, has_more_history = conversation_history(request.user.id, applicant.id)
     
     # Mark unread messages as read
-    Message.objects.filter(
-        sender=applicant, receiver=request.user, is_read=False
-    ).update(is_read=True)
+    if mark_conversation_read(request.user.id, applicant.id):
+        push_read_receipt(request.user.id, applicant.id)
     
     # Get job applications from this applicant
     applications = JobApplication.objects.filter(user=applicant, job__user=request.user).select_related('job')
-    conversations = _get_employer_conversations(request.user)
+    conversations = _get_employer_conversations(request.user).object_list
 
     return render(request, "employers/employer_conversation.html", {
         "applicant": applicant,
         "conversation": convo,
+        "has_more_history": has_more_history,
         "applications": applications,
         "conversations": conversations,
     })
@@ -2164,33 +2250,17 @@ def employer_search_messages(request):
     if not query:
         return JsonResponse({"results": []})
     
-    # Get employer's jobs
-    employer_jobs = Job.objects.filter(user=request.user)
-    applicant_ids = JobApplication.objects.filter(job__in=employer_jobs).values_list('user_id', flat=True)
-    
-    # Search in messages where user is sender or receiver (and other party is an applicant)
-    messages_found = Message.objects.filter(
-        Q(sender=request.user, receiver_id__in=applicant_ids) | 
-        Q(sender_id__in=applicant_ids, receiver=request.user),
-        content__icontains=query,
-        is_deleted=False
-    ).select_related('sender', 'receiver', 'sender__profile', 'receiver__profile').order_by('-sent_at')[:20]
-    
-    results = []
-    for msg in messages_found:
-        other_user = msg.receiver if msg.sender == request.user else msg.sender
-        results.append({
-            "id": msg.id,
-            "content": msg.content,
-            "sent_at": msg.sent_at.strftime("%b %d, %H:%M"),
-            "other_user_id": other_user.id,
-            "other_user_name": other_user.profile.full_name or other_user.username,
-            "is_sender": msg.sender == request.user
-        })
+    # Only conversations with applicants to this employer's jobs
+    results = [
+        _search_result(msg, snippet, request.user)
+        for msg, snippet in message_search.search_messages(request.user, query, applicants_only=True)
+    ]
     
     return JsonResponse({"results": results})
 
 
+APPLICANTS_PAGE_SIZE = 25
+
 @login_required
 def employer_applicants(request):
     """Employer applicants view showing all applications to their jobs"""
@@ -2199,37 +2269,56 @@ def employer_applicants(request):
     
     # Get all job applicants for jobs posted by this employer
     employer_jobs = Job.objects.filter(user=request.user)
-    applications = JobApplication.objects.filter(job__in=employer_jobs).select_related('user', 'job', 'user__profile').order_by('-applied_at')
+    applications = JobApplication.objects.filter(job__user=request.user)
+
+    # Match scores are precomputed per application (see main/matching.py)
+    has_desired = request.user.profile.desired_skills.exists()
+    show_all = request.GET.get('match') == 'all'
+    if has_desired and not show_all:
+        applications = applications.filter(skill_match_count__gt=0)
 
-    # Filter applicants to those matching employer desired skills (by name)
-    desired_names = list(request.user.profile.desired_skills.values_list('name', flat=True))
-    if desired_names:
-        applications = applications.filter(user__profile__skills__name__in=desired_names).distinct()
-    
     # Get filter options
     status_filter = request.GET.get('status', '')
     job_filter = request.GET.get('job', '')
-    
-    # Apply filters
+    sort = request.GET.get('sort') or ('match' if has_desired else 'newest')
+
+    if job_filter.isdigit():
+        applications = applications.filter(job__id=job_filter)
+
+    # One grouped aggregate for the status cards (before the status filter)
+    status_counts = dict(applications.order_by().values_list('status').annotate(n=Count('id')))
+
     if status_filter:
         applications = applications.filter(status=status_filter)
-    if job_filter:
-        applications = applications.filter(job__id=job_filter)
-    
+    if sort == 'match':
+        applications = applications.order_by('-skill_match_score', '-applied_at', '-id')
+    else:
+        applications = applications.order_by('-applied_at', '-id')
+
+    paginator = Paginator(applications.select_related('user', 'job', 'user__profile'), APPLICANTS_PAGE_SIZE)
+    page = paginator.get_page(request.GET.get('page'))
+    query = request.GET.copy()
+    query.pop('page', None)
+
     # Get available statuses and jobs for filter dropdown
     available_statuses = JobApplication.STATUS_CHOICES
     available_jobs = employer_jobs.all()
-    
+
     context = {
-        'applications': applications,
+        'applications': page.object_list,
+        'page_obj': page,
+        'base_query': query.urlencode(),
         'available_statuses': available_statuses,
         'available_jobs': available_jobs,
         'current_status': status_filter,
         'current_job': job_filter,
-        'total_applicants': JobApplication.objects.filter(job__in=employer_jobs).count(),
-        'pending_count': applications.filter(status='Pending').count(),
-        'interview_count': applications.filter(status='Interview').count(),
-        'accepted_count': applications.filter(status='Accepted').count(),
+        'current_sort': sort,
+        'show_all': show_all,
+        'has_desired_skills': has_desired,
+        'total_applicants': sum(status_counts.values()),
+        'pending_count': status_counts.get('Pending', 0),
+        'interview_count': status_counts.get('Interview', 0),
+        'accepted_count': status_counts.get('Accepted', 0),
     }
     
     return render(request, "employers/employer_applicants.html", context)
@@ -2251,10 +2340,7 @@ def employer_interview_detail(request, app_id):
         scheduled_at_str = request.POST.get('scheduled_at')  # HTML datetime-local
         location = request.POST.get('location', '')
         meeting_url = request.POST.get('meeting_url', '')
-        try:
-            duration_minutes = int(request.POST.get('duration_minutes', '45'))
-        except ValueError:
-            duration_minutes = 45
+        duration_minutes = scheduling.parse_duration(request.POST.get('duration_minutes'))
 
         try:
             if scheduled_at_str:
@@ -2267,10 +2353,14 @@ def employer_interview_detail(request, app_id):
             return render(request, 'employers/employer_interview.html', {'application': application})
 
         application.interview_scheduled_at = aware_dt
+        application.interview_duration_minutes = duration_minutes
         application.interview_location = location or None
         application.interview_meeting_url = meeting_url or None
         application.status = 'Interview'
-        application.save()
+        with transaction.atomic():
+            # Serialise with batch scheduling (main/scheduling.py)
+            scheduling.lock_calendars([request.user.id, application.user_id])
+            application.save()
 
         # Notify applicant
         Notification.objects.create(
@@ -2283,6 +2373,9 @@ def employer_interview_detail(request, app_id):
         )
 
         messages.success(request, 'Interview scheduled successfully!')
+        clashes = _interview_clashes(request.user, application)
+        if clashes:
+            messages.warning(request, f'This interview overlaps {clashes} other interview(s) of yours.')
         return redirect('employer_applicants')
 
     return render(request, 'employers/employer_interview.html', {
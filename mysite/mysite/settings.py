@@ -3,8 +3,11 @@ Django settings for mysite project.
 Generated by 'django-admin startproject' using Django 5.2.9
 """
 
+import os
 from pathlib import Path
 
+from dotenv import load_dotenv
+
 
 
 
@@ -13,6 +16,9 @@ from pathlib import Path
 # ======================
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Environment overrides from mysite/.env (real environment variables win)
+load_dotenv(BASE_DIR / ".env")
+
 
 # ======================
 # SECURITY
@@ -52,6 +58,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "main.broadcast.BroadcastBufferMiddleware",  # Batches WebSocket pushes until the response is ready
     # "axes.middleware.AxesMiddleware",  # Commented out - axes disabled
 ]
 
@@ -90,16 +97,100 @@ CHANNEL_LAYERS = {
     }
 }
 
+# WebSocket presence registry (see main/presence.py). "local" is per-process
+# and only correct with one worker; use "redis" alongside a Redis channel layer.
+PRESENCE_BACKEND = "local"
+PRESENCE_REDIS_URL = "redis://127.0.0.1:6379/1"
+PRESENCE_TTL_SECONDS = 90
+# Offline users get their missed notifications by email from
+# `manage.py send_notification_digests` (main/digest.py); items listed per email.
+NOTIFICATION_DIGEST_MAX_ITEMS = 20
+
+# Messaging sidebar contacts (main/contacts.py)
+MESSAGE_CONTACTS_PAGE_SIZE = 50
+MESSAGE_CONTACTS_CACHE_SECONDS = 300
+
+# Message archival (python manage.py archive_messages, see main/archive.py).
+# None keeps live messages in the hot table forever; only read ones are archived.
+MESSAGE_RETENTION_DAYS = None
+MESSAGE_DELETED_RETENTION_DAYS = 30
+MESSAGE_ARCHIVE_BATCH_SIZE = 1000
+
+# Audit log writer (main/audit.py): entries are queued and bulk-inserted by a
+# background thread. AUDIT_LOG_SYNC = True writes each entry immediately.
+AUDIT_LOG_SYNC = False
+AUDIT_LOG_BATCH_SIZE = 200
+AUDIT_LOG_FLUSH_SECONDS = 2.0
+AUDIT_LOG_QUEUE_SIZE = 10000
+AUDIT_LOG_RETENTION_MONTHS = 12         # prune_audit_log keeps this many months (incl. the current one)
+
+# Admin dashboard rollups (python manage.py rollup_stats, see main/rollups.py);
+# schedule the command, e.g. every few minutes from cron.
+STATS_ROLLUP_BATCH_SIZE = 5000
+STATS_CACHE_SECONDS = 300
+
+# Rendered interview invitation PDFs (main/pdf.py). Private data: keep this
+# outside MEDIA_ROOT and anything else that is web-served.
+INTERVIEW_PDF_CACHE_DIR = BASE_DIR / "cache" / "interview_pdfs"
+
+# Interview calendar feeds (main/ics.py): how long a rendered feed is cached,
+# which bounds staleness after changes that do not reset it (deletes, renames),
+# and how far back past interviews are listed.
+ICS_FEED_CACHE_SECONDS = 3600
+ICS_FEED_PAST_DAYS = 90
+
 
 # ======================
 # DATABASE
 # ======================
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_ENGINE=sqlite (default) or postgres. PostgreSQL settings:
+#   POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT
+#   DB_CONN_MAX_AGE   seconds to keep a connection open (default 60)
+#   DB_POOL=1         use Django's psycopg 3 pool instead of persistent connections
+#   DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE / DB_POOL_TIMEOUT
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite").lower()
+
+if DB_ENGINE in ("postgres", "postgresql"):
+    DB_POOL = os.environ.get("DB_POOL", "0").lower() in ("1", "true", "yes")
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "mysite"),
+            "USER": os.environ.get("POSTGRES_USER", "mysite"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "127.0.0.1"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            # The pool manages connection lifetime itself; Django requires 0 here.
+            "CONN_MAX_AGE": 0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+                    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+                    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+                },
+            } if DB_POOL else {},
+        }
     }
-}
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            "OPTIONS": {
+                # Take the write lock up front so concurrent writers queue on
+                # busy_timeout instead of failing (PRAGMAs: main/dbtuning.py).
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
+
+# Tests run against a throwaway PostgreSQL cluster when initdb/pg_ctl and
+# psycopg are available, otherwise against SQLite (TEST_DB=sqlite forces it).
+TEST_RUNNER = "main.testrunner.TempPostgresTestRunner"
+
+# Per-connection SQLite PRAGMAs; merged over main.dbtuning.DEFAULT_SQLITE_PRAGMAS
+SQLITE_PRAGMAS = {}
 
 
 # ======================